@@ -5,21 +5,31 @@ Autor: Silhouette Anónimo
 Fecha: 08-Nov-2025
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Query, Header
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from starlette.routing import Match
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Set, Tuple, AsyncIterator, Callable, Awaitable
 import jwt
 import asyncpg
 import asyncio
 import logging
+import time
+import math
 import uuid
 from datetime import datetime, timedelta
 import os
 import redis
+from redis import asyncio as aioredis
 import json
+import base64
+import hashlib
+import re
+from collections import OrderedDict
+from functools import lru_cache
 from contextlib import asynccontextmanager
 
 # Configuración de logging
@@ -37,6 +47,66 @@ JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "haas-super-secret-key-2025")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRE_HOURS = 24
 
+# Streaming de estado (SSE)
+STATUS_CHANNEL_PREFIX = os.getenv("STATUS_CHANNEL_PREFIX", "haas:status")
+STREAM_HEARTBEAT_SECONDS = int(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+STREAM_MAX_SUBSCRIPTIONS = int(os.getenv("STREAM_MAX_SUBSCRIPTIONS", "500"))
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+
+# Creación masiva de tareas
+BATCH_MAX_TASKS = int(os.getenv("BATCH_MAX_TASKS", "50000"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "1000"))
+# El INSERT multi-fila de un bloque usa 4 parámetros comunes y 3 por tarea;
+# PostgreSQL no admite más de 32767 parámetros por sentencia
+POSTGRES_MAX_BIND_PARAMS = 32767
+BATCH_MAX_CHUNK_SIZE = (POSTGRES_MAX_BIND_PARAMS - 4) // 3
+if not 1 <= BATCH_CHUNK_SIZE <= BATCH_MAX_CHUNK_SIZE:
+    raise ValueError(f"BATCH_CHUNK_SIZE must be between 1 and {BATCH_MAX_CHUNK_SIZE}, got {BATCH_CHUNK_SIZE}")
+
+# Consultas a read models
+READ_MODEL_DEFAULT_LIMIT = int(os.getenv("READ_MODEL_DEFAULT_LIMIT", "100"))
+READ_MODEL_MAX_LIMIT = int(os.getenv("READ_MODEL_MAX_LIMIT", "1000"))
+READ_MODEL_STREAM_PREFETCH = int(os.getenv("READ_MODEL_STREAM_PREFETCH", "500"))
+STATEMENT_CACHE_SIZE = int(os.getenv("STATEMENT_CACHE_SIZE", "256"))
+
+# Control de admisión (load shedding estilo CoDel)
+ADMISSION_TARGET_DELAY_MS = float(os.getenv("ADMISSION_TARGET_DELAY_MS", "50"))
+ADMISSION_INTERVAL_MS = float(os.getenv("ADMISSION_INTERVAL_MS", "500"))
+ADMISSION_MAX_IN_FLIGHT_PER_ROUTE = int(os.getenv("ADMISSION_MAX_IN_FLIGHT_PER_ROUTE", "200"))
+ADMISSION_MAX_QUEUE_WAIT_MS = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT_MS", "1000"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+ADMISSION_MAX_IN_FLIGHT_HIGH_PER_ROUTE = int(os.getenv("ADMISSION_MAX_IN_FLIGHT_HIGH_PER_ROUTE", "400"))
+ADMISSION_ROUTE_CACHE_SIZE = int(os.getenv("ADMISSION_ROUTE_CACHE_SIZE", "10000"))
+# Apps y tenants (según el JWT verificado) cuyo tráfico es de alta prioridad
+ADMISSION_HIGH_PRIORITY_APPS = frozenset(
+    item.strip() for item in os.getenv("ADMISSION_HIGH_PRIORITY_APPS", "").split(",") if item.strip()
+)
+ADMISSION_HIGH_PRIORITY_TENANTS = frozenset(
+    item.strip() for item in os.getenv("ADMISSION_HIGH_PRIORITY_TENANTS", "").split(",") if item.strip()
+)
+# Rutas siempre prioritarias y rutas de larga duración que no cuentan como in-flight
+ADMISSION_HIGH_PRIORITY_PATHS = ("/health", "/auth/token", "/metrics/admission")
+ADMISSION_LONG_LIVED_PREFIXES = ("/stream/",)
+
+# Ejecución de workflows cross-app
+WORKFLOW_DEFAULT_PARALLELISM = int(os.getenv("WORKFLOW_DEFAULT_PARALLELISM", "8"))
+WORKFLOW_MAX_PARALLELISM = int(os.getenv("WORKFLOW_MAX_PARALLELISM", "32"))
+WORKFLOW_MAX_STEPS = int(os.getenv("WORKFLOW_MAX_STEPS", "200"))
+WORKFLOW_MAX_DEADLINE_SECONDS = int(os.getenv("WORKFLOW_MAX_DEADLINE_SECONDS", "3600"))
+
+# Idempotencia de endpoints POST
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_LOCK_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_TTL_SECONDS", "60"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+IDEMPOTENCY_MAX_KEY_LENGTH = 255
+
+# Caché de lecturas de contexto
+CONTEXT_CACHE_TTL_SECONDS = float(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "5"))
+CONTEXT_CACHE_MAX_ENTRIES = int(os.getenv("CONTEXT_CACHE_MAX_ENTRIES", "10000"))
+# Vida de la versión vigente publicada en Redis: acota cuánto puede durar una
+# versión obsoleta si falla la escritura de la clave tras un update
+CONTEXT_HEAD_TTL_SECONDS = int(os.getenv("CONTEXT_HEAD_TTL_SECONDS", "300"))
+
 # Modelos de datos
 class AppProfile(BaseModel):
     """Perfil de aplicación registrado en el sistema"""
@@ -61,6 +131,48 @@ class TaskRequest(BaseModel):
     timeout: Optional[int] = Field(default=300, description="Timeout en segundos")
     callback_url: Optional[str] = Field(None, description="URL para callback")
     
+class BatchTaskRequest(BaseModel):
+    """Solicitud de creación masiva de tareas"""
+    tasks: List[TaskRequest] = Field(..., description="Tareas a crear")
+    
+    @validator("tasks")
+    def validate_batch_size(cls, tasks):
+        if not tasks:
+            raise ValueError("Batch must contain at least one task")
+        if len(tasks) > BATCH_MAX_TASKS:
+            raise ValueError(f"Batch exceeds maximum of {BATCH_MAX_TASKS} tasks")
+        return tasks
+    
+class WorkflowStep(BaseModel):
+    """Paso de un workflow cross-app ejecutado por un equipo/app"""
+    step_id: str = Field(..., description="Identificador único del paso")
+    team_name: str = Field(..., description="Equipo o app que ejecuta el paso")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Datos del paso")
+    depends_on: List[str] = Field(default_factory=list, description="Pasos que deben completarse antes")
+    timeout: Optional[int] = Field(None, ge=1, description="Timeout del paso en segundos")
+    
+class CrossAppWorkflowRequest(BaseModel):
+    """Definición de un workflow cross-app"""
+    name: Optional[str] = Field(None, description="Nombre del workflow")
+    steps: List[WorkflowStep] = Field(..., description="Pasos del workflow")
+    max_parallel: int = Field(
+        default=WORKFLOW_DEFAULT_PARALLELISM, ge=1, le=WORKFLOW_MAX_PARALLELISM,
+        description="Pasos ejecutados en paralelo como máximo"
+    )
+    deadline_seconds: int = Field(
+        default=300, ge=1, le=WORKFLOW_MAX_DEADLINE_SECONDS,
+        description="Deadline global del workflow en segundos"
+    )
+    stream: bool = Field(default=False, description="Emitir resultados parciales como NDJSON")
+    
+    @validator("steps")
+    def validate_steps(cls, steps):
+        if not steps:
+            raise ValueError("Workflow must contain at least one step")
+        if len(steps) > WORKFLOW_MAX_STEPS:
+            raise ValueError(f"Workflow exceeds maximum of {WORKFLOW_MAX_STEPS} steps")
+        return steps
+    
 class PlanRequest(BaseModel):
     """Solicitud de creación de plan"""
     objective: str = Field(..., description="Objetivo del plan")
@@ -84,6 +196,21 @@ class TaskResponse(BaseModel):
     assigned_team: str
     message: str
     
+class BatchTaskItemResult(BaseModel):
+    """Resultado de una tarea dentro de un lote"""
+    index: int
+    task_id: Optional[str] = None
+    status: str
+    error: Optional[str] = None
+    
+class BatchTaskResponse(BaseModel):
+    """Respuesta de creación masiva de tareas"""
+    batch_id: str
+    total: int
+    accepted: int
+    rejected: int
+    results: List[BatchTaskItemResult]
+    
 class PlanResponse(BaseModel):
     """Respuesta de creación de plan"""
     plan_id: str
@@ -220,11 +347,101 @@ class AuthenticationManager:
 # GESTIÓN DE BASE DE DATOS
 # =====================================================
 
+# Read models consultables. Los nombres de tabla y de columna de filtro nunca
+# se interpolan desde la entrada del cliente sin pasar por esta lista blanca.
+# Solo se declaran las columnas que el gateway filtra u ordena; la proyección
+# por defecto es ``*`` y las columnas de ``?fields=`` se validan contra el
+# esquema real de la tabla (``DatabaseManager.table_columns``).
+# "order_by" y "id_column" definen la clave del cursor de paginación.
+READ_MODEL_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "app_profiles": {
+        "filters": ("app_id", "tenant_id"),
+        "order_by": "created_at",
+        "id_column": "app_id"
+    },
+    "task_read_model": {
+        "filters": ("task_id", "tenant_id", "app_id", "task_status"),
+        "order_by": "created_at",
+        "id_column": "task_id"
+    },
+    "plan_read_model": {
+        "filters": ("plan_id", "tenant_id", "app_id", "plan_status"),
+        "order_by": "created_at",
+        "id_column": "plan_id"
+    },
+    "shared_context": {
+        "filters": ("tenant_id", "app_id", "context_type", "context_key"),
+        "order_by": "created_at",
+        "id_column": "context_id"
+    }
+}
+COLUMN_NAME_PATTERN = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+@lru_cache(maxsize=512)
+def build_read_model_query(
+    table: str,
+    columns: Tuple[str, ...],
+    filter_keys: Tuple[str, ...],
+    with_cursor: bool,
+    descending: bool,
+    with_limit: bool
+) -> str:
+    """Construye el SQL de una forma de consulta (cacheado por forma)
+    
+    Un texto SQL estable por forma hace que asyncpg reutilice el prepared
+    statement de su caché por conexión en lugar de re-preparar en cada request.
+    """
+    schema = READ_MODEL_SCHEMAS[table]
+    order_by, id_column = schema["order_by"], schema["id_column"]
+    
+    where_clauses = [f"{key} = ${i}" for i, key in enumerate(filter_keys, start=1)]
+    next_param = len(filter_keys) + 1
+    if with_cursor:
+        operator = "<" if descending else ">"
+        where_clauses.append(
+            f"({order_by}, {id_column}) {operator} (${next_param}, ${next_param + 1})"
+        )
+        next_param += 2
+    
+    where_clause = " AND ".join(where_clauses) if where_clauses else "1=1"
+    direction = "DESC" if descending else "ASC"
+    projection = ", ".join(columns) if columns else "*"
+    query = (
+        f"SELECT {projection} FROM {table} WHERE {where_clause} "
+        f"ORDER BY {order_by} {direction}, {id_column} {direction}"
+    )
+    if with_limit:
+        query += f" LIMIT ${next_param}"
+    return query
+
+def encode_cursor(row: Dict[str, Any], table: str) -> str:
+    """Codifica la clave de paginación de la última fila de una página"""
+    schema = READ_MODEL_SCHEMAS[table]
+    sort_value = row[schema["order_by"]]
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, str(row[schema["id_column"]])])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """Decodifica un cursor opaco generado por encode_cursor"""
+    try:
+        sort_value, id_value = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if isinstance(sort_value, str):
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, id_value
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
 class DatabaseManager:
     """Gestor de conexiones a base de datos con contexto multi-tenant"""
     
     def __init__(self):
         self.connection_pool = None
+        self.columns_cache: Dict[str, Set[str]] = {}
     
     async def init_pool(self):
         """Inicializa el pool de conexiones"""
@@ -232,7 +449,8 @@ class DatabaseManager:
             DATABASE_URL,
             min_size=5,
             max_size=20,
-            command_timeout=60
+            command_timeout=60,
+            statement_cache_size=STATEMENT_CACHE_SIZE
         )
     
     async def get_connection(self):
@@ -268,28 +486,181 @@ class DatabaseManager:
         finally:
             await self.connection_pool.release(conn)
     
-    async def get_read_model(self, table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Obtiene datos de un read model con filtros"""
-        conn = await self.get_connection()
-        try:
-            # Construir query dinámico
-            where_clauses = []
-            values = []
-            value_count = 1
-            
-            for key, value in filters.items():
-                where_clauses.append(f"{key} = ${value_count}")
-                values.append(value)
-                value_count += 1
-            
-            where_clause = " AND ".join(where_clauses) if where_clauses else "1=1"
-            query = f"SELECT * FROM {table} WHERE {where_clause}"
-            
+    async def execute_event_store_batch(
+        self,
+        tenant_id: str,
+        app_id: str,
+        event_type: str,
+        events: List[Dict[str, Any]],
+        aggregate_type: str = None,
+        aggregate_ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Almacena varios eventos del mismo tipo con un único INSERT multi-fila"""
+        if not events:
+            return []
+        
+        event_ids = [str(uuid.uuid4()) for _ in events]
+        aggregate_ids = aggregate_ids or [None] * len(events)
+        
+        # $1..$4 son comunes a todo el lote; cada fila aporta 3 parámetros
+        values_clauses = []
+        values = [tenant_id, app_id, event_type, aggregate_type]
+        for i, (event_id, event_data, aggregate_id) in enumerate(zip(event_ids, events, aggregate_ids)):
+            base = 5 + i * 3
+            values_clauses.append(f"(${base}, $1, $2, $3, ${base + 1}, $4, ${base + 2}, NOW())")
+            values.extend([event_id, json.dumps(event_data), aggregate_id])
+        
+        async with self.connection_pool.acquire() as conn:
+            await conn.execute(f"""
+                INSERT INTO event_store 
+                (event_id, tenant_id, app_id, event_type, event_data, 
+                 aggregate_type, aggregate_id, event_timestamp)
+                VALUES {", ".join(values_clauses)}
+            """, *values)
+        
+        return event_ids
+    
+    def prepare_read_model_query(
+        self,
+        table: str,
+        filters: Dict[str, Any],
+        columns: Optional[List[str]],
+        cursor: Optional[str],
+        descending: bool,
+        limit: Optional[int]
+    ) -> Tuple[str, List[Any]]:
+        """Valida tabla, columnas y filtros contra la lista blanca y arma la consulta
+        
+        Sin ``columns`` se proyecta ``*``. Que las columnas pedidas existan lo
+        comprueba quien recibe ``?fields=`` con ``table_columns``; aquí solo se
+        garantiza que son identificadores seguros de interpolar.
+        """
+        schema = READ_MODEL_SCHEMAS.get(table)
+        if not schema:
+            raise ValueError(f"Unknown read model: {table}")
+        
+        invalid = [column for column in filters if column not in schema["filters"]]
+        invalid += [column for column in columns or () if not COLUMN_NAME_PATTERN.match(column)]
+        if invalid:
+            raise ValueError(f"Invalid columns for {table}: {', '.join(sorted(set(invalid)))}")
+        
+        # Las columnas de la clave del cursor siempre se proyectan
+        projection: Tuple[str, ...] = ()
+        if columns:
+            key_columns = (schema["order_by"], schema["id_column"])
+            projection = tuple(dict.fromkeys(tuple(columns) + key_columns))
+        
+        filter_keys = tuple(sorted(filters))
+        values = [filters[key] for key in filter_keys]
+        if cursor:
+            values.extend(decode_cursor(cursor))
+        if limit is not None:
+            values.append(limit)
+        
+        query = build_read_model_query(
+            table, projection, filter_keys, bool(cursor), descending, limit is not None
+        )
+        return query, values
+    
+    async def get_read_model(
+        self, 
+        table: str, 
+        filters: Dict[str, Any],
+        columns: Optional[List[str]] = None,
+        limit: int = READ_MODEL_DEFAULT_LIMIT
+    ) -> List[Dict[str, Any]]:
+        """Obtiene datos de un read model con filtros
+        
+        Devuelve como mucho ``limit`` filas (por defecto READ_MODEL_DEFAULT_LIMIT
+        y nunca más de READ_MODEL_MAX_LIMIT), sin indicar si había más. Para
+        paginar se usa ``query_read_model`` y para recorrer todas las filas
+        ``stream_read_model``.
+        """
+        rows, _ = await self.query_read_model(table, filters, columns=columns, limit=limit)
+        return rows
+    
+    async def query_read_model(
+        self,
+        table: str,
+        filters: Dict[str, Any],
+        columns: Optional[List[str]] = None,
+        limit: int = READ_MODEL_DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+        descending: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Obtiene una página de un read model con paginación keyset
+        
+        Devuelve las filas y el cursor de la siguiente página (None si no hay más).
+        """
+        limit = max(1, min(limit, READ_MODEL_MAX_LIMIT))
+        # Se pide una fila extra para saber si existe una página siguiente
+        query, values = self.prepare_read_model_query(
+            table, filters, columns, cursor, descending, limit + 1
+        )
+        
+        if not self.connection_pool:
+            await self.init_pool()
+        async with self.connection_pool.acquire() as conn:
             rows = await conn.fetch(query, *values)
-            return [dict(row) for row in rows]
-            
-        finally:
-            await self.connection_pool.release(conn)
+        
+        results = [dict(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(results[-1], table) if len(rows) > limit else None
+        return results, next_cursor
+    
+    async def table_columns(self, table: str) -> Set[str]:
+        """Columnas reales de un read model, leídas una vez del catálogo"""
+        if table not in self.columns_cache:
+            if not self.connection_pool:
+                await self.init_pool()
+            async with self.connection_pool.acquire() as conn:
+                rows = await conn.fetch(
+                    "SELECT column_name FROM information_schema.columns WHERE table_name = $1", table
+                )
+            self.columns_cache[table] = {row["column_name"] for row in rows}
+        return self.columns_cache[table]
+    
+    async def context_head(
+        self, tenant_id: str, app_id: str, context_type: str, context_key: str
+    ) -> Optional[Tuple[str, str]]:
+        """Identidad de la versión vigente de un contexto leída de PostgreSQL
+        
+        Devuelve (context_id, md5 del valor) o None si el contexto no existe.
+        Solo se usa cuando la versión no está publicada en Redis, porque el
+        md5 obliga a leer el valor completo.
+        """
+        if not self.connection_pool:
+            await self.init_pool()
+        async with self.connection_pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT context_id, md5(context_value::text) AS digest
+                FROM shared_context
+                WHERE tenant_id = $1 AND app_id = $2 AND context_type = $3 AND context_key = $4
+                ORDER BY created_at DESC, context_id DESC
+                LIMIT 1
+            """, tenant_id, app_id, context_type, context_key)
+        return (str(row["context_id"]), row["digest"]) if row else None
+    
+    async def stream_read_model(
+        self,
+        table: str,
+        filters: Dict[str, Any],
+        columns: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Recorre un read model con un cursor de servidor sin materializar el resultado"""
+        query, values = self.prepare_read_model_query(
+            table, filters, columns, cursor, descending, limit
+        )
+        
+        if not self.connection_pool:
+            await self.init_pool()
+        async with self.connection_pool.acquire() as conn:
+            # Los cursores de asyncpg requieren una transacción abierta
+            async with conn.transaction():
+                async for row in conn.cursor(query, *values, prefetch=READ_MODEL_STREAM_PREFETCH):
+                    yield dict(row)
 
 # =====================================================
 # GESTIÓN DE CUOTAS Y RATE LIMITING
@@ -305,8 +676,9 @@ class QuotaManager:
         """Verifica si la aplicación puede hacer una request"""
         try:
             # Obtener límites de la app desde la base de datos
-            db_manager = DatabaseManager()
-            apps = await db_manager.get_read_model("app_profiles", {"app_id": app_id})
+            apps = await db_manager.get_read_model(
+                "app_profiles", {"app_id": app_id}, columns=["quotas"], limit=1
+            )
             
             if not apps:
                 return False
@@ -345,6 +717,60 @@ class QuotaManager:
         except Exception as e:
             logger.error(f"Error incrementing usage: {str(e)}")
     
+    async def reserve_quota(
+        self, 
+        app_id: str, 
+        tenant_id: str, 
+        amount: int, 
+        quota_type: str = "requests_per_hour"
+    ) -> int:
+        """Reserva cuota para un lote completo y devuelve cuántas unidades se concedieron"""
+        try:
+            apps = await db_manager.get_read_model(
+                "app_profiles", {"app_id": app_id}, columns=["quotas"], limit=1
+            )
+            
+            if not apps:
+                return 0
+            
+            quota_limit = apps[0].get("quotas", {}).get(quota_type, 1000)
+            
+            current_hour = datetime.utcnow().strftime("%Y-%m-%d-%H")
+            key = f"quota:{app_id}:{tenant_id}:{quota_type}:{current_hour}"
+            
+            # INCRBY es atómico: cada lote solo devuelve su propio exceso
+            pipe = self.redis_client.pipeline()
+            pipe.incrby(key, amount)
+            pipe.expire(key, 3600)
+            new_usage, _ = pipe.execute()
+            
+            overflow = max(0, new_usage - quota_limit)
+            granted = max(0, amount - overflow)
+            if granted < amount:
+                self.redis_client.decrby(key, amount - granted)
+                logger.warning(f"Quota partially granted for app {app_id}: {granted}/{amount}")
+            
+            return granted
+            
+        except Exception as e:
+            logger.error(f"Error reserving quota: {str(e)}")
+            return amount  # Permitir en caso de error para no bloquear
+    
+    async def release_quota(
+        self, 
+        app_id: str, 
+        tenant_id: str, 
+        amount: int, 
+        quota_type: str = "requests_per_hour"
+    ):
+        """Devuelve cuota reservada que finalmente no se consumió"""
+        try:
+            current_hour = datetime.utcnow().strftime("%Y-%m-%d-%H")
+            key = f"quota:{app_id}:{tenant_id}:{quota_type}:{current_hour}"
+            self.redis_client.decrby(key, amount)
+        except Exception as e:
+            logger.error(f"Error releasing quota: {str(e)}")
+    
     async def get_current_usage(self, app_id: str, tenant_id: str, quota_type: str) -> int:
         """Obtiene el uso actual de cuota"""
         try:
@@ -395,7 +821,7 @@ class TeamRouter:
             # Por ahora, simulamos la respuesta
             return {
                 "status": "delegated",
-                "orchestrator_request_id": str(uuid.uuid4()),
+                "orchestrator_request_id": request_data["request_id"],
                 "message": "Request forwarded to orchestrator",
                 "estimated_processing_time": 30
             }
@@ -407,6 +833,35 @@ class TeamRouter:
                 detail="Orchestrator service unavailable"
             )
     
+    async def route_batch_to_orchestrator(
+        self, 
+        app_id: str, 
+        tenant_id: str, 
+        requests_data: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Rutea un lote de requests al Orquestador en una única llamada"""
+        try:
+            # En una implementación real, POST {orchestrator_url}/orchestrate/async/batch
+            # con {"requests": requests_data}; un 503 (cola llena) se propaga como
+            # error y el bloque devuelve su cuota. Por ahora, simulamos la respuesta
+            # por elemento
+            return [
+                {
+                    "status": "delegated",
+                    "orchestrator_request_id": request_data["request_id"],
+                    "message": "Request forwarded to orchestrator",
+                    "estimated_processing_time": 30
+                }
+                for request_data in requests_data
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error routing batch to orchestrator: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Orchestrator service unavailable"
+            )
+    
     async def route_to_planner(
         self, 
         app_id: str, 
@@ -458,6 +913,817 @@ class TeamRouter:
             logger.error(f"Error routing to specialist team: {str(e)}")
             raise
 
+# =====================================================
+# IDEMPOTENCIA DE REQUESTS
+# =====================================================
+
+class IdempotencyManager:
+    """Soporte de cabecera Idempotency-Key con respuestas almacenadas en Redis
+    
+    - La primera request con una clave se ejecuta y su respuesta se guarda con TTL.
+    - Los duplicados concurrentes en la misma réplica esperan a la request en
+      curso; en otras réplicas esperan a que aparezca la respuesta almacenada.
+    - Los reintentos posteriores reciben la respuesta guardada sin tocar
+      Postgres ni el orquestador.
+    - El lock entre réplicas lleva un token propio y se renueva mientras el
+      handler se ejecuta; si la request original se cancela, los duplicados
+      en espera reciben un 409 reintentable.
+    """
+    
+    # Renovar y liberar el lock solo si sigue siendo nuestro
+    LOCK_REFRESH_SCRIPT = """
+        if redis.call('GET', KEYS[1]) == ARGV[1] then
+            return redis.call('EXPIRE', KEYS[1], ARGV[2])
+        end
+        return 0
+    """
+    LOCK_RELEASE_SCRIPT = """
+        if redis.call('GET', KEYS[1]) == ARGV[1] then
+            return redis.call('DEL', KEYS[1])
+        end
+        return 0
+    """
+    
+    def __init__(self):
+        self.redis_client = aioredis.from_url(REDIS_URL)
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.refresh_lock = self.redis_client.register_script(self.LOCK_REFRESH_SCRIPT)
+        self.release_lock = self.redis_client.register_script(self.LOCK_RELEASE_SCRIPT)
+    
+    @staticmethod
+    def fingerprint(payload: Dict[str, Any]) -> str:
+        """Huella estable del cuerpo para detectar reutilización de la clave"""
+        canonical = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+    
+    def _replay(self, stored: Dict[str, Any], fingerprint: str) -> JSONResponse:
+        """Construye la respuesta a partir de una respuesta almacenada"""
+        if stored["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key reused with a different request body"
+            )
+        return JSONResponse(
+            status_code=stored["status_code"],
+            content=stored["body"],
+            headers={"Idempotent-Replayed": "true"}
+        )
+    
+    async def _load(self, redis_key: str) -> Optional[Dict[str, Any]]:
+        stored = await self.redis_client.get(redis_key)
+        return json.loads(stored) if stored else None
+    
+    async def _wait_for_stored(self, redis_key: str) -> Optional[Dict[str, Any]]:
+        """Espera la respuesta de una request en curso en otra réplica"""
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            stored = await self._load(redis_key)
+            if stored:
+                return stored
+            delay = min(delay * 2, 0.5)
+        return None
+    
+    async def _keep_lock(self, lock_key: str, token: str):
+        """Renueva el TTL del lock mientras dura el handler"""
+        interval = max(IDEMPOTENCY_LOCK_TTL_SECONDS / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.refresh_lock(keys=[lock_key], args=[token, IDEMPOTENCY_LOCK_TTL_SECONDS]):
+                    logger.warning(f"Idempotency lock {lock_key} expired before the request finished")
+                    return
+            except Exception as e:
+                logger.error(f"Error refreshing idempotency lock: {str(e)}")
+    
+    async def run(
+        self,
+        current_user: Dict[str, Any],
+        endpoint: str,
+        idempotency_key: Optional[str],
+        payload: Dict[str, Any],
+        handler: Callable[[], Awaitable[BaseModel]]
+    ) -> Union[BaseModel, JSONResponse]:
+        """Ejecuta ``handler`` como máximo una vez por clave de idempotencia"""
+        if not idempotency_key:
+            return await handler()
+        
+        if len(idempotency_key) > IDEMPOTENCY_MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Idempotency-Key too long"
+            )
+        
+        redis_key = (
+            f"idempotency:{current_user['tenant_id']}:{current_user['app_id']}:"
+            f"{endpoint}:{idempotency_key}"
+        )
+        lock_key = f"{redis_key}:lock"
+        fingerprint = self.fingerprint(payload)
+        
+        # Duplicado concurrente en esta réplica: compartir el resultado en curso
+        in_flight = self.in_flight.get(redis_key)
+        if in_flight:
+            stored = await asyncio.shield(in_flight)
+            return self._replay(stored, fingerprint)
+        
+        stored = await self._load(redis_key)
+        if stored:
+            return self._replay(stored, fingerprint)
+        
+        token = uuid.uuid4().hex
+        if not await self.redis_client.set(lock_key, token, nx=True, ex=IDEMPOTENCY_LOCK_TTL_SECONDS):
+            # Otra réplica está procesando la misma clave
+            stored = await self._wait_for_stored(redis_key)
+            if stored:
+                return self._replay(stored, fingerprint)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress"
+            )
+        
+        # La request original pudo guardar su respuesta y soltar el lock entre
+        # la lectura anterior y el SET NX: comprobarlo ya con el lock tomado
+        stored = await self._load(redis_key)
+        if stored:
+            await self.release_lock(keys=[lock_key], args=[token])
+            return self._replay(stored, fingerprint)
+        
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[redis_key] = future
+        keeper = asyncio.create_task(self._keep_lock(lock_key, token))
+        try:
+            response = await handler()
+            stored = {
+                "fingerprint": fingerprint,
+                "status_code": status.HTTP_200_OK,
+                "body": jsonable_encoder(response)
+            }
+            await self.redis_client.set(redis_key, json.dumps(stored), ex=IDEMPOTENCY_TTL_SECONDS)
+            future.set_result(stored)
+            return response
+        except asyncio.CancelledError:
+            # Los duplicados en espera no deben heredar la cancelación: reciben
+            # un 409 y su reintento volverá a ejecutar la request
+            future.set_exception(HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The original request with this Idempotency-Key was cancelled; retry",
+                headers={"Retry-After": "1"}
+            ))
+            future.exception()
+            raise
+        except Exception as e:
+            # Los errores no se almacenan: un reintento podrá volver a ejecutarse
+            future.set_exception(e)
+            # Evitar el aviso de excepción no recuperada si nadie esperaba
+            future.exception()
+            raise
+        finally:
+            keeper.cancel()
+            self.in_flight.pop(redis_key, None)
+            await self.release_lock(keys=[lock_key], args=[token])
+
+# =====================================================
+# CACHÉ Y VERSIONADO DE CONTEXTO
+# =====================================================
+
+class ContextCacheManager:
+    """ETag por entrada de contexto y caché de respuestas serializadas
+    
+    El ETag es el id de la fila vigente (las actualizaciones insertan filas
+    nuevas) más el md5 de su valor. ``/context/update`` lo publica en Redis
+    al escribir, así que comprobarlo es un GET de Redis sin tocar PostgreSQL.
+    Si la clave falta (flush, expiración, otro escritor) se calcula una vez en
+    PostgreSQL y se publica con NX para no pisar un update concurrente. Si la
+    fila leída no coincide con la versión publicada, la clave se descarta.
+    Cada réplica guarda en memoria el cuerpo ya serializado de cada entrada
+    junto con su ETag: una lectura cuyo ETag coincide se sirve sin volver a
+    leer ni serializar el valor, y un If-None-Match coincidente se responde
+    con 304 sin cuerpo.
+    """
+    
+    def __init__(self):
+        self.redis_client = aioredis.from_url(REDIS_URL)
+        # clave -> (etag, cuerpo serializado, instante de expiración)
+        self.entries: "OrderedDict[Tuple[str, str, str, str], Tuple[str, bytes, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.head_misses = 0
+    
+    @staticmethod
+    def etag(context_id: str, digest: str) -> str:
+        return f'"{context_id}.{digest}"'
+    
+    @staticmethod
+    def digest(serialized_value: str) -> str:
+        return hashlib.md5(serialized_value.encode()).hexdigest()
+    
+    @staticmethod
+    def head_key(key: Tuple[str, str, str, str]) -> str:
+        return "context_head:" + ":".join(key)
+    
+    async def read_head(self, key: Tuple[str, str, str, str]) -> Optional[Tuple[str, str]]:
+        """Versión vigente publicada en Redis, o None si no está (o Redis falla)"""
+        try:
+            head = await self.redis_client.get(self.head_key(key))
+        except Exception as e:
+            logger.warning(f"Error reading context head: {str(e)}")
+            return None
+        if head is None:
+            return None
+        context_id, _, digest = head.decode().partition(".")
+        return context_id, digest
+    
+    async def write_head(self, key: Tuple[str, str, str, str], context_id: str, digest: str,
+                         only_if_absent: bool = False):
+        """Publica la versión vigente; con ``only_if_absent`` no pisa la de un update"""
+        try:
+            await self.redis_client.set(
+                self.head_key(key), f"{context_id}.{digest}",
+                ex=CONTEXT_HEAD_TTL_SECONDS, nx=only_if_absent
+            )
+        except Exception as e:
+            logger.warning(f"Error writing context head: {str(e)}")
+    
+    async def drop_head(self, key: Tuple[str, str, str, str]):
+        try:
+            await self.redis_client.delete(self.head_key(key))
+        except Exception as e:
+            logger.warning(f"Error dropping context head: {str(e)}")
+    
+    def invalidate(self, key: Tuple[str, str, str, str]):
+        """Descarta el cuerpo cacheado localmente (las demás réplicas lo detectan por ETag)"""
+        self.entries.pop(key, None)
+    
+    def get_cached(self, key: Tuple[str, str, str, str], etag: str) -> Optional[bytes]:
+        """Cuerpo cacheado si sigue vigente para el ETag indicado"""
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        cached_etag, body, expires_at = entry
+        if cached_etag != etag or expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return body
+    
+    def store(self, key: Tuple[str, str, str, str], etag: str, body: bytes):
+        """Guarda un cuerpo serializado con expiración corta y límite LRU"""
+        self.entries[key] = (etag, body, time.monotonic() + CONTEXT_CACHE_TTL_SECONDS)
+        self.entries.move_to_end(key)
+        while len(self.entries) > CONTEXT_CACHE_MAX_ENTRIES:
+            self.entries.popitem(last=False)
+
+# =====================================================
+# EJECUTOR DE WORKFLOWS CROSS-APP
+# =====================================================
+
+class WorkflowExecutor:
+    """Ejecuta los pasos de un workflow respetando dependencias y paralelismo
+    
+    Los pasos independientes se lanzan en cuanto sus dependencias terminan, con
+    un máximo de ``max_parallel`` simultáneos, de forma que la latencia total es
+    la de la rama más larga y no la suma de todos los pasos.
+    """
+    
+    def __init__(self, router: "TeamRouter"):
+        self.router = router
+    
+    def validate(self, steps: List[WorkflowStep]) -> Dict[str, List[str]]:
+        """Valida ids, equipos y dependencias; devuelve el mapa de dependientes"""
+        step_ids = [step.step_id for step in steps]
+        if len(set(step_ids)) != len(step_ids):
+            raise ValueError("Duplicate step_id in workflow")
+        
+        known = set(step_ids)
+        dependents: Dict[str, List[str]] = {step_id: [] for step_id in step_ids}
+        pending_deps = {}
+        for step in steps:
+            if step.team_name not in self.router.specialist_team_urls:
+                raise ValueError(f"Unknown specialist team: {step.team_name}")
+            unknown = [dep for dep in step.depends_on if dep not in known]
+            if unknown:
+                raise ValueError(f"Step {step.step_id} depends on unknown steps: {', '.join(unknown)}")
+            for dep in set(step.depends_on):
+                dependents[dep].append(step.step_id)
+            pending_deps[step.step_id] = len(set(step.depends_on))
+        
+        # Kahn: si no se pueden ordenar todos los pasos hay un ciclo
+        ready = [step_id for step_id, count in pending_deps.items() if count == 0]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for dependent in dependents[current]:
+                pending_deps[dependent] -= 1
+                if pending_deps[dependent] == 0:
+                    ready.append(dependent)
+        if visited != len(steps):
+            raise ValueError("Workflow dependencies contain a cycle")
+        
+        return dependents
+    
+    async def _run_step(
+        self,
+        step: WorkflowStep,
+        dependency_results: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        deadline: float
+    ) -> Dict[str, Any]:
+        """Ejecuta un paso dentro del límite de paralelismo y su timeout"""
+        async with semaphore:
+            started = time.monotonic()
+            remaining = deadline - started
+            timeout = min(step.timeout, remaining) if step.timeout else remaining
+            payload = dict(step.payload)
+            if dependency_results:
+                payload["dependency_results"] = dependency_results
+            try:
+                result = await asyncio.wait_for(
+                    self.router.route_to_specialist_team(step.team_name, payload),
+                    timeout=max(timeout, 0)
+                )
+                step_status, error = "completed", None
+            except asyncio.TimeoutError:
+                result, step_status, error = None, "timed_out", "Step timed out"
+            except HTTPException as e:
+                result, step_status, error = None, "failed", str(e.detail)
+            except Exception as e:
+                result, step_status, error = None, "failed", str(e)
+            
+            return {
+                "step_id": step.step_id,
+                "team_name": step.team_name,
+                "status": step_status,
+                "result": result,
+                "error": error,
+                "duration_seconds": round(time.monotonic() - started, 3)
+            }
+    
+    async def run(self, request: CrossAppWorkflowRequest) -> AsyncIterator[Dict[str, Any]]:
+        """Ejecuta el workflow y emite el resultado de cada paso al terminar"""
+        dependents = self.validate(request.steps)
+        steps = {step.step_id: step for step in request.steps}
+        remaining_deps = {step.step_id: set(step.depends_on) for step in request.steps}
+        results: Dict[str, Dict[str, Any]] = {}
+        
+        semaphore = asyncio.Semaphore(request.max_parallel)
+        deadline = time.monotonic() + request.deadline_seconds
+        running: Dict[asyncio.Task, str] = {}
+        
+        def launch(step_id: str):
+            step = steps[step_id]
+            dependency_results = {dep: results[dep]["result"] for dep in step.depends_on}
+            task = asyncio.create_task(self._run_step(step, dependency_results, semaphore, deadline))
+            running[task] = step_id
+        
+        def skip_dependents(step_id: str, reason: str) -> List[Dict[str, Any]]:
+            skipped = []
+            stack = list(dependents[step_id])
+            while stack:
+                dependent = stack.pop()
+                if dependent in results:
+                    continue
+                results[dependent] = {
+                    "step_id": dependent,
+                    "team_name": steps[dependent].team_name,
+                    "status": "skipped",
+                    "result": None,
+                    "error": reason,
+                    "duration_seconds": 0.0
+                }
+                skipped.append(results[dependent])
+                stack.extend(dependents[dependent])
+            return skipped
+        
+        for step_id, deps in remaining_deps.items():
+            if not deps:
+                launch(step_id)
+        
+        try:
+            while running:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                done, _ = await asyncio.wait(
+                    running.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    step_id = running.pop(task)
+                    step_result = task.result()
+                    results[step_id] = step_result
+                    yield step_result
+                    
+                    if step_result["status"] != "completed":
+                        for skipped in skip_dependents(step_id, f"Dependency {step_id} {step_result['status']}"):
+                            yield skipped
+                        continue
+                    
+                    for dependent in dependents[step_id]:
+                        remaining_deps[dependent].discard(step_id)
+                        if not remaining_deps[dependent] and dependent not in results:
+                            launch(dependent)
+        finally:
+            # Deadline global alcanzado o cliente desconectado: esperar a que los
+            # pasos cancelados terminen para que liberen el semáforo y sus conexiones
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+        
+        for step_id, step in steps.items():
+            if step_id not in results:
+                results[step_id] = {
+                    "step_id": step_id,
+                    "team_name": step.team_name,
+                    "status": "deadline_exceeded",
+                    "result": None,
+                    "error": "Workflow deadline exceeded",
+                    "duration_seconds": 0.0
+                }
+                yield results[step_id]
+
+# =====================================================
+# STREAMING DE ESTADO DE TAREAS Y PLANES
+# =====================================================
+
+class StatusStreamManager:
+    """Fan-out de transiciones de estado vía Redis pub/sub hacia conexiones SSE
+    
+    Cada réplica del gateway mantiene una única suscripción por patrón a Redis
+    y reparte los eventos en memoria entre las conexiones interesadas, de modo
+    que el coste por evento no depende del número de clientes conectados.
+    """
+    
+    def __init__(self):
+        self.redis_client = aioredis.from_url(REDIS_URL)
+        # (tenant_id, app_id, entity_type, entity_id) -> colas de las conexiones suscritas
+        self.subscribers: Dict[Tuple[str, str, str, str], Set[asyncio.Queue]] = {}
+        self.listener_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Arranca el listener de Redis pub/sub"""
+        if not self.listener_task:
+            self.listener_task = asyncio.create_task(self._listen())
+    
+    async def stop(self):
+        """Detiene el listener y cierra la conexión a Redis"""
+        if self.listener_task:
+            self.listener_task.cancel()
+            try:
+                await self.listener_task
+            except asyncio.CancelledError:
+                pass
+            self.listener_task = None
+        await self.redis_client.close()
+    
+    async def _listen(self):
+        """Consume el canal de estados y reintenta ante desconexiones de Redis"""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{STATUS_CHANNEL_PREFIX}:*")
+                async for message in pubsub.listen():
+                    if message.get("type") == "pmessage":
+                        self._dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Status stream listener error: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+    
+    def _dispatch(self, raw_message: Union[str, bytes]):
+        """Entrega un evento a las colas suscritas a esa tarea o plan"""
+        try:
+            event = json.loads(raw_message)
+            key = (event["tenant_id"], event["app_id"], event["entity_type"], event["entity_id"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Discarding malformed status event")
+            return
+        
+        for queue in self.subscribers.get(key, ()):
+            if queue.full():
+                # Cliente lento: se descarta el evento más antiguo, el último estado prevalece
+                queue.get_nowait()
+            queue.put_nowait(event)
+    
+    def subscribe(self, keys: List[Tuple[str, str, str, str]]) -> asyncio.Queue:
+        """Registra una conexión para un conjunto de tareas/planes"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        for key in keys:
+            self.subscribers.setdefault(key, set()).add(queue)
+        return queue
+    
+    def unsubscribe(self, keys: List[Tuple[str, str, str, str]], queue: asyncio.Queue):
+        """Elimina las suscripciones de una conexión cerrada"""
+        for key in keys:
+            queues = self.subscribers.get(key)
+            if queues:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[key]
+    
+    async def publish(
+        self,
+        tenant_id: str,
+        app_id: str,
+        entity_type: str,
+        entity_id: str,
+        new_status: str,
+        data: Optional[Dict[str, Any]] = None
+    ):
+        """Publica una transición de estado para todas las réplicas del gateway"""
+        try:
+            message = {
+                "tenant_id": tenant_id,
+                "app_id": app_id,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "status": new_status,
+                "data": data or {},
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            await self.redis_client.publish(
+                f"{STATUS_CHANNEL_PREFIX}:{tenant_id}",
+                json.dumps(message, default=str)
+            )
+        except Exception as e:
+            logger.error(f"Error publishing status event: {str(e)}")
+
+    async def publish_many(self, tenant_id: str, app_id: str, transitions: List[Dict[str, Any]]):
+        """Publica varias transiciones en un único pipeline de Redis"""
+        try:
+            channel = f"{STATUS_CHANNEL_PREFIX}:{tenant_id}"
+            timestamp = datetime.utcnow().isoformat()
+            pipe = self.redis_client.pipeline(transaction=False)
+            for transition in transitions:
+                pipe.publish(channel, json.dumps({
+                    "tenant_id": tenant_id,
+                    "app_id": app_id,
+                    "entity_type": transition["entity_type"],
+                    "entity_id": transition["entity_id"],
+                    "status": transition["status"],
+                    "data": transition.get("data", {}),
+                    "timestamp": timestamp
+                }, default=str))
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error publishing status events: {str(e)}")
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Serializa un mensaje en formato Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+# =====================================================
+# CONTROL DE ADMISIÓN Y LOAD SHEDDING
+# =====================================================
+
+class RouteAdmissionState:
+    """Estado CoDel y contadores de una ruta
+    
+    Cada prioridad tiene su propio cupo de slots, de modo que la alta
+    prioridad no compite con la baja pero tampoco crece sin límite.
+    """
+    
+    def __init__(self, max_in_flight: int, max_in_flight_high: int):
+        self.slots = {"low": asyncio.Semaphore(max_in_flight), "high": asyncio.Semaphore(max_in_flight_high)}
+        self.in_flight = 0
+        self.waiting = 0
+        self.first_above_time = 0.0
+        self.dropping = False
+        self.drop_count = 0
+        self.drop_next = 0.0
+        self.last_sojourn_ms = 0.0
+        self.admitted = {"high": 0, "low": 0}
+        self.shed = {"high": 0, "low": 0}
+
+class AdmissionController:
+    """Admisión basada en el retardo de cola medido en proceso (CoDel)
+    
+    El retardo de cola de una request es el tiempo que espera por un slot de su
+    ruta más el retardo actual del event loop. Si el mínimo se mantiene sobre el
+    objetivo durante un intervalo completo, la ruta entra en modo "dropping" y
+    las requests de baja prioridad se rechazan al llegar con 503 y Retry-After,
+    mientras que el tráfico de alta prioridad sigue admitiéndose.
+    
+    En modo dropping el retardo se sigue midiendo: si la ruta no tiene cola se
+    toma el retardo del event loop, y además se admite una request de sondeo
+    cada ``interval/sqrt(count)`` (cadencia de CoDel). Así una ruta sin tráfico
+    de alta prioridad también sale del modo dropping al recuperarse.
+    """
+    
+    def __init__(self):
+        self.routes: Dict[str, RouteAdmissionState] = {}
+        self.route_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.loop_lag_ms = 0.0
+        self.monitor_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Arranca la medición del retardo del event loop"""
+        if not self.monitor_task:
+            self.monitor_task = asyncio.create_task(self._monitor_loop_lag())
+    
+    async def stop(self):
+        """Detiene la medición del retardo del event loop"""
+        if self.monitor_task:
+            self.monitor_task.cancel()
+            try:
+                await self.monitor_task
+            except asyncio.CancelledError:
+                pass
+            self.monitor_task = None
+    
+    async def _monitor_loop_lag(self, probe_interval: float = 0.1):
+        """Mide cuánto se retrasa el event loop respecto a un sleep programado"""
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(probe_interval)
+            lag_ms = max(0.0, (time.monotonic() - started - probe_interval) * 1000)
+            # Media móvil exponencial para suavizar picos aislados
+            self.loop_lag_ms = 0.8 * self.loop_lag_ms + 0.2 * lag_ms
+    
+    def route_key(self, scope: Dict[str, Any]) -> str:
+        """Resuelve la plantilla de ruta (p.ej. GET /tasks/{task_id}) de una request
+        
+        El resultado se cachea por (método, path) con expulsión LRU.
+        """
+        cache_key = (scope["method"], scope["path"])
+        key = self.route_cache.get(cache_key)
+        if key is not None:
+            self.route_cache.move_to_end(cache_key)
+            return key
+        
+        key = f"{scope['method']} <unmatched>"
+        for route in app.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                key = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+                break
+        self.route_cache[cache_key] = key
+        if len(self.route_cache) > ADMISSION_ROUTE_CACHE_SIZE:
+            self.route_cache.popitem(last=False)
+        return key
+    
+    def priority_class(self, scope: Dict[str, Any]) -> str:
+        """Clasifica la request como alta o baja prioridad
+        
+        La prioridad sale de la app o el tenant del JWT verificado, nunca de
+        una cabecera que el cliente pueda fijar a su gusto.
+        """
+        if scope["path"] in ADMISSION_HIGH_PRIORITY_PATHS:
+            return "high"
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer":
+                    break
+                try:
+                    payload = jwt.decode(token.strip(), JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+                except jwt.InvalidTokenError:
+                    break
+                if (payload.get("app_id") in ADMISSION_HIGH_PRIORITY_APPS
+                        or payload.get("tenant_id") in ADMISSION_HIGH_PRIORITY_TENANTS):
+                    return "high"
+                break
+        return "low"
+    
+    def _update_codel(self, state: RouteAdmissionState, sojourn_ms: float, now: float):
+        """Ley de control CoDel sobre el retardo observado"""
+        state.last_sojourn_ms = sojourn_ms
+        if sojourn_ms < ADMISSION_TARGET_DELAY_MS:
+            state.first_above_time = 0.0
+            state.dropping = False
+            state.drop_count = 0
+        elif state.first_above_time == 0.0:
+            state.first_above_time = now + ADMISSION_INTERVAL_MS / 1000
+        elif now >= state.first_above_time and not state.dropping:
+            state.dropping = True
+            state.drop_count = 1
+            state.drop_next = now + ADMISSION_INTERVAL_MS / 1000
+    
+    def _probe_due(self, state: RouteAdmissionState, now: float) -> bool:
+        """En modo dropping, admite una request de sondeo cada interval/sqrt(count)"""
+        if now < state.drop_next:
+            return False
+        state.drop_count += 1
+        state.drop_next = now + ADMISSION_INTERVAL_MS / 1000 / math.sqrt(state.drop_count)
+        return True
+    
+    async def admit(self, scope: Dict[str, Any]) -> Tuple[bool, str, str, bool]:
+        """Decide si se admite la request
+        
+        Devuelve (admitida, ruta, prioridad, ocupa_slot).
+        """
+        key = self.route_key(scope)
+        priority = self.priority_class(scope)
+        state = self.routes.get(key)
+        if state is None:
+            state = self.routes[key] = RouteAdmissionState(
+                ADMISSION_MAX_IN_FLIGHT_PER_ROUTE, ADMISSION_MAX_IN_FLIGHT_HIGH_PER_ROUTE
+            )
+        
+        now = time.monotonic()
+        long_lived = scope["path"].startswith(ADMISSION_LONG_LIVED_PREFIXES)
+        if long_lived or (state.dropping and not state.waiting and not state.slots[priority].locked()):
+            # Sin espera por slot el retardo de cola es el del event loop
+            self._update_codel(state, self.loop_lag_ms, now)
+        
+        if priority == "low" and state.dropping and not self._probe_due(state, now):
+            state.shed[priority] += 1
+            return False, key, priority, False
+        
+        if long_lived:
+            # Conexiones de larga duración: sin slot, pero sujetas a shedding
+            state.admitted[priority] += 1
+            return True, key, priority, False
+        
+        started = time.monotonic()
+        state.waiting += 1
+        try:
+            await asyncio.wait_for(state.slots[priority].acquire(), timeout=ADMISSION_MAX_QUEUE_WAIT_MS / 1000)
+            holds_slot = True
+        except asyncio.TimeoutError:
+            holds_slot = False
+        finally:
+            state.waiting -= 1
+        
+        now = time.monotonic()
+        sojourn_ms = (now - started) * 1000 + self.loop_lag_ms
+        self._update_codel(state, sojourn_ms, now)
+        
+        if not holds_slot:
+            state.shed[priority] += 1
+            return False, key, priority, False
+        
+        state.in_flight += 1
+        state.admitted[priority] += 1
+        return True, key, priority, holds_slot
+    
+    def release(self, key: str, priority: str, holds_slot: bool):
+        """Libera el slot de una request finalizada"""
+        state = self.routes[key]
+        state.in_flight -= 1
+        if holds_slot:
+            state.slots[priority].release()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Métricas de admisión y decisiones de shedding por ruta"""
+        return {
+            "loop_lag_ms": round(self.loop_lag_ms, 3),
+            "target_delay_ms": ADMISSION_TARGET_DELAY_MS,
+            "interval_ms": ADMISSION_INTERVAL_MS,
+            "routes": {
+                key: {
+                    "in_flight": state.in_flight,
+                    "waiting": state.waiting,
+                    "dropping": state.dropping,
+                    "probes": max(0, state.drop_count - 1),
+                    "last_sojourn_ms": round(state.last_sojourn_ms, 3),
+                    "admitted": dict(state.admitted),
+                    "shed": dict(state.shed)
+                }
+                for key, state in self.routes.items()
+            }
+        }
+
+class AdmissionControlMiddleware:
+    """Middleware ASGI que aplica el AdmissionController antes del routing"""
+    
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        admitted, key, priority, holds_slot = await self.controller.admit(scope)
+        if not admitted:
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={
+                    "error": "Service overloaded, retry later",
+                    "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "timestamp": datetime.utcnow().isoformat()
+                },
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+        
+        if scope["path"].startswith(ADMISSION_LONG_LIVED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(key, priority, holds_slot)
+
 # =====================================================
 # APLICACIÓN FASTAPI
 # =====================================================
@@ -467,17 +1733,28 @@ auth_manager = AuthenticationManager()
 db_manager = DatabaseManager()
 quota_manager = QuotaManager()
 team_router = TeamRouter()
+status_stream_manager = StatusStreamManager()
+admission_controller = AdmissionController()
+workflow_executor = WorkflowExecutor(team_router)
+idempotency_manager = IdempotencyManager()
+context_cache = ContextCacheManager()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gestión del ciclo de vida de la aplicación"""
     # Startup
     await db_manager.init_pool()
+    await status_stream_manager.start()
+    await admission_controller.start()
     logger.info("API Gateway started successfully")
     
     yield
     
     # Shutdown
+    await admission_controller.stop()
+    await status_stream_manager.stop()
+    await idempotency_manager.redis_client.close()
+    await context_cache.redis_client.close()
     if db_manager.connection_pool:
         await db_manager.connection_pool.close()
     logger.info("API Gateway shutdown completed")
@@ -490,6 +1767,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Control de admisión (registrado antes que CORS para que CORS lo envuelva)
+app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -552,9 +1832,17 @@ async def get_app_profile(
 @app.post("/tasks/create", response_model=TaskResponse)
 async def create_task(
     request: TaskRequest,
-    current_user: Dict = Depends(auth_manager.authenticate_app)
+    current_user: Dict = Depends(auth_manager.authenticate_app),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Crea una nueva tarea y la delega al orquestador"""
+    return await idempotency_manager.run(
+        current_user, "tasks/create", idempotency_key, request.dict(),
+        lambda: process_create_task(request, current_user)
+    )
+
+async def process_create_task(request: TaskRequest, current_user: Dict) -> TaskResponse:
+    """Lógica de creación de tarea (ejecutada una vez por clave de idempotencia)"""
     try:
         app_id = current_user["app_id"]
         tenant_id = current_user["tenant_id"]
@@ -581,9 +1869,13 @@ async def create_task(
             }
         )
         
-        # Rutear al orquestador
+        # Rutear al orquestador; el request_id es el task_id que verá el cliente
+        # y bajo el que el orquestador publica las transiciones
         result = await team_router.route_to_orchestrator(
             app_id, tenant_id, {
+                "request_id": str(uuid.uuid4()),
+                "app_id": app_id,
+                "tenant_id": tenant_id,
                 "objective": request.objective,
                 "task_type": request.task_type,
                 "inputs": request.inputs,
@@ -594,6 +1886,10 @@ async def create_task(
             }
         )
         
+        await status_stream_manager.publish(
+            tenant_id, app_id, "task", result.get("orchestrator_request_id"), result["status"]
+        )
+        
         return TaskResponse(
             task_id=result.get("orchestrator_request_id"),
             status=result["status"],
@@ -611,6 +1907,217 @@ async def create_task(
             detail="Failed to create task"
         )
 
+async def process_task_batch_chunk(
+    app_id: str,
+    tenant_id: str,
+    batch_id: str,
+    indexed_tasks: List[Tuple[int, TaskRequest]]
+) -> List[BatchTaskItemResult]:
+    """Registra y delega un bloque del lote con un INSERT y una llamada al orquestador"""
+    task_ids = [str(uuid.uuid4()) for _ in indexed_tasks]
+    
+    try:
+        await db_manager.execute_event_store_batch(
+            tenant_id, app_id, "TaskCreated",
+            [
+                {
+                    "batch_id": batch_id,
+                    "objective": task.objective,
+                    "task_type": task.task_type,
+                    "inputs": task.inputs,
+                    "context": task.context,
+                    "priority": task.priority
+                }
+                for _, task in indexed_tasks
+            ],
+            aggregate_type="Task",
+            aggregate_ids=task_ids
+        )
+        
+        routed = await team_router.route_batch_to_orchestrator(
+            app_id, tenant_id, [
+                {
+                    "request_id": task_id,
+                    "app_id": app_id,
+                    "tenant_id": tenant_id,
+                    "batch_id": batch_id,
+                    "objective": task.objective,
+                    "task_type": task.task_type,
+                    "inputs": task.inputs,
+                    "context": task.context,
+                    "priority": task.priority,
+                    "timeout": task.timeout,
+                    "callback_url": task.callback_url
+                }
+                for task_id, (_, task) in zip(task_ids, indexed_tasks)
+            ]
+        )
+    except Exception as e:
+        logger.error(f"Error processing task batch chunk: {str(e)}")
+        await quota_manager.release_quota(app_id, tenant_id, len(indexed_tasks))
+        return [
+            BatchTaskItemResult(index=index, status="failed", error="Failed to create task")
+            for index, _ in indexed_tasks
+        ]
+    
+    await status_stream_manager.publish_many(tenant_id, app_id, [
+        {"entity_type": "task", "entity_id": result["orchestrator_request_id"], "status": result["status"]}
+        for result in routed
+    ])
+    
+    return [
+        BatchTaskItemResult(
+            index=index,
+            task_id=result.get("orchestrator_request_id"),
+            status=result["status"]
+        )
+        for (index, _), result in zip(indexed_tasks, routed)
+    ]
+
+@app.post("/tasks/batch", response_model=BatchTaskResponse)
+async def create_task_batch(
+    request: BatchTaskRequest,
+    http_request: Request,
+    stream: bool = Query(default=False, description="Devolver resultados como NDJSON"),
+    current_user: Dict = Depends(auth_manager.authenticate_app)
+):
+    """Crea un lote de tareas autenticando y reservando cuota una sola vez
+    
+    Con ``stream=true`` (o ``Accept: application/x-ndjson``) los resultados se
+    emiten por bloques a medida que se procesan, una línea JSON por tarea
+    seguida de una línea final con el resumen.
+    """
+    app_id = current_user["app_id"]
+    tenant_id = current_user["tenant_id"]
+    batch_id = str(uuid.uuid4())
+    total = len(request.tasks)
+    
+    granted = await quota_manager.reserve_quota(app_id, tenant_id, total)
+    indexed_tasks = list(enumerate(request.tasks))
+    accepted_tasks = indexed_tasks[:granted]
+    quota_rejected = [
+        BatchTaskItemResult(index=index, status="rejected", error="Quota exceeded")
+        for index, _ in indexed_tasks[granted:]
+    ]
+    
+    started = 0
+    
+    async def iterate_results(stop: Optional[Callable[[], Awaitable[bool]]] = None):
+        nonlocal started
+        for start in range(0, len(accepted_tasks), BATCH_CHUNK_SIZE):
+            if stop and await stop():
+                return
+            chunk = accepted_tasks[start:start + BATCH_CHUNK_SIZE]
+            # Un bloque empezado consume su cuota (si falla la devuelve él mismo)
+            started += len(chunk)
+            for item in await process_task_batch_chunk(app_id, tenant_id, batch_id, chunk):
+                yield item
+        for item in quota_rejected:
+            yield item
+    
+    wants_ndjson = "application/x-ndjson" in http_request.headers.get("accept", "")
+    if stream or wants_ndjson:
+        async def ndjson_generator():
+            accepted = 0
+            try:
+                async for item in iterate_results(stop=http_request.is_disconnected):
+                    if item.error is None:
+                        accepted += 1
+                    yield json.dumps(item.dict()) + "\n"
+            finally:
+                # Cliente desconectado a mitad: devolver la cuota de los bloques no procesados
+                unprocessed = len(accepted_tasks) - started
+                if unprocessed:
+                    await quota_manager.release_quota(app_id, tenant_id, unprocessed)
+            if started < len(accepted_tasks):
+                return
+            yield json.dumps({"summary": {
+                "batch_id": batch_id,
+                "total": total,
+                "accepted": accepted,
+                "rejected": total - accepted
+            }}) + "\n"
+        
+        return StreamingResponse(ndjson_generator(), media_type="application/x-ndjson")
+    
+    results = [item async for item in iterate_results()]
+    results.sort(key=lambda item: item.index)
+    accepted = sum(1 for item in results if item.error is None)
+    
+    return BatchTaskResponse(
+        batch_id=batch_id,
+        total=total,
+        accepted=accepted,
+        rejected=total - accepted,
+        results=results
+    )
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Convierte el parámetro ?fields=a,b en una lista de columnas"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+async def list_read_model(
+    table: str,
+    filters: Dict[str, Any],
+    fields: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+    stream: bool
+):
+    """Respuesta paginada o streaming NDJSON común a los listados de read models"""
+    columns = parse_fields(fields)
+    
+    try:
+        # Validar antes de abrir el stream para poder responder 400
+        db_manager.prepare_read_model_query(table, filters, columns, cursor, True, None)
+        if columns:
+            unknown = set(columns) - await db_manager.table_columns(table)
+            if unknown:
+                raise ValueError(f"Invalid columns for {table}: {', '.join(sorted(unknown))}")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if stream:
+        async def ndjson_generator():
+            async for row in db_manager.stream_read_model(
+                table, filters, columns=columns, cursor=cursor, descending=True
+            ):
+                yield json.dumps(row, default=str) + "\n"
+        
+        return StreamingResponse(ndjson_generator(), media_type="application/x-ndjson")
+    
+    rows, next_cursor = await db_manager.query_read_model(
+        table, filters, columns=columns, limit=limit, cursor=cursor, descending=True
+    )
+    return {"items": rows, "next_cursor": next_cursor, "count": len(rows)}
+
+@app.get("/tasks")
+async def list_tasks(
+    task_status: Optional[str] = Query(default=None, description="Filtrar por estado"),
+    fields: Optional[str] = Query(default=None, description="Columnas separadas por comas"),
+    limit: int = Query(default=READ_MODEL_DEFAULT_LIMIT, ge=1, le=READ_MODEL_MAX_LIMIT),
+    cursor: Optional[str] = Query(default=None, description="Cursor de la página siguiente"),
+    stream: bool = Query(default=False, description="Devolver todas las filas como NDJSON"),
+    current_user: Dict = Depends(auth_manager.authenticate_app)
+):
+    """Lista las tareas de la aplicación, de la más reciente a la más antigua"""
+    filters = {"tenant_id": current_user["tenant_id"], "app_id": current_user["app_id"]}
+    if task_status:
+        filters["task_status"] = task_status
+    
+    try:
+        return await list_read_model("task_read_model", filters, fields, limit, cursor, stream)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing tasks: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to list tasks"
+        )
+
 @app.get("/tasks/{task_id}")
 async def get_task_status(
     task_id: str,
@@ -626,7 +2133,7 @@ async def get_task_status(
             "tenant_id": tenant_id,
             "app_id": app_id,
             "task_id": task_id
-        })
+        }, limit=1)
         
         if not tasks:
             raise HTTPException(
@@ -652,9 +2159,17 @@ async def get_task_status(
 @app.post("/plans/create", response_model=PlanResponse)
 async def create_plan(
     request: PlanRequest,
-    current_user: Dict = Depends(auth_manager.authenticate_app)
+    current_user: Dict = Depends(auth_manager.authenticate_app),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Crea un nuevo plan de trabajo"""
+    return await idempotency_manager.run(
+        current_user, "plans/create", idempotency_key, request.dict(),
+        lambda: process_create_plan(request, current_user)
+    )
+
+async def process_create_plan(request: PlanRequest, current_user: Dict) -> PlanResponse:
+    """Lógica de creación de plan (ejecutada una vez por clave de idempotencia)"""
     try:
         app_id = current_user["app_id"]
         tenant_id = current_user["tenant_id"]
@@ -690,6 +2205,11 @@ async def create_plan(
             }
         )
         
+        await status_stream_manager.publish(
+            tenant_id, app_id, "plan", result["plan_id"], result["status"],
+            {"total_tasks": result["total_tasks"]}
+        )
+        
         return PlanResponse(
             plan_id=result["plan_id"],
             status=result["status"],
@@ -707,6 +2227,28 @@ async def create_plan(
             detail="Failed to create plan"
         )
 
+@app.get("/plans")
+async def list_plans(
+    fields: Optional[str] = Query(default=None, description="Columnas separadas por comas"),
+    limit: int = Query(default=READ_MODEL_DEFAULT_LIMIT, ge=1, le=READ_MODEL_MAX_LIMIT),
+    cursor: Optional[str] = Query(default=None, description="Cursor de la página siguiente"),
+    stream: bool = Query(default=False, description="Devolver todas las filas como NDJSON"),
+    current_user: Dict = Depends(auth_manager.authenticate_app)
+):
+    """Lista los planes de la aplicación, del más reciente al más antiguo"""
+    filters = {"tenant_id": current_user["tenant_id"], "app_id": current_user["app_id"]}
+    
+    try:
+        return await list_read_model("plan_read_model", filters, fields, limit, cursor, stream)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing plans: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to list plans"
+        )
+
 @app.get("/plans/{plan_id}")
 async def get_plan_status(
     plan_id: str,
@@ -721,7 +2263,7 @@ async def get_plan_status(
             "tenant_id": tenant_id,
             "app_id": app_id,
             "plan_id": plan_id
-        })
+        }, limit=1)
         
         if not plans:
             raise HTTPException(
@@ -740,6 +2282,74 @@ async def get_plan_status(
             detail="Failed to get plan"
         )
 
+# =====================================================
+# ENDPOINTS DE STREAMING DE ESTADO
+# =====================================================
+
+@app.get("/stream/status")
+async def stream_status(
+    request: Request,
+    task_id: List[str] = Query(default=[], description="Tareas a seguir"),
+    plan_id: List[str] = Query(default=[], description="Planes a seguir"),
+    current_user: Dict = Depends(auth_manager.authenticate_app)
+):
+    """Stream SSE con las transiciones de estado de varias tareas y planes
+    
+    Sustituye al polling de GET /tasks/{task_id} y GET /plans/{plan_id}: la
+    autenticación y el snapshot inicial se hacen una sola vez por conexión y
+    después solo se envían los cambios emitidos por el orquestador.
+    """
+    app_id = current_user["app_id"]
+    tenant_id = current_user["tenant_id"]
+    
+    entities = [("task", entity_id) for entity_id in dict.fromkeys(task_id)]
+    entities += [("plan", entity_id) for entity_id in dict.fromkeys(plan_id)]
+    
+    if not entities:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one task_id or plan_id is required"
+        )
+    if len(entities) > STREAM_MAX_SUBSCRIPTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many subscriptions (max {STREAM_MAX_SUBSCRIPTIONS})"
+        )
+    
+    keys = [(tenant_id, app_id, entity_type, entity_id) for entity_type, entity_id in entities]
+    read_models = {"task": "task_read_model", "plan": "plan_read_model"}
+    
+    async def event_generator():
+        # Suscribir antes del snapshot para no perder transiciones intermedias
+        queue = status_stream_manager.subscribe(keys)
+        try:
+            for entity_type, entity_id in entities:
+                rows = await db_manager.get_read_model(read_models[entity_type], {
+                    "tenant_id": tenant_id,
+                    "app_id": app_id,
+                    f"{entity_type}_id": entity_id
+                }, limit=1)
+                yield format_sse("snapshot", {
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "state": rows[0] if rows else None
+                })
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                    yield format_sse("status", event)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            status_stream_manager.unsubscribe(keys, queue)
+    
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # =====================================================
 # ENDPOINTS DE CONTEXTO Y MEMORIA
 # =====================================================
@@ -747,15 +2357,24 @@ async def get_plan_status(
 @app.post("/context/update", response_model=ContextResponse)
 async def update_context(
     request: ContextUpdate,
-    current_user: Dict = Depends(auth_manager.authenticate_app)
+    current_user: Dict = Depends(auth_manager.authenticate_app),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Actualiza el contexto de la aplicación"""
+    return await idempotency_manager.run(
+        current_user, "context/update", idempotency_key, request.dict(),
+        lambda: process_update_context(request, current_user)
+    )
+
+async def process_update_context(request: ContextUpdate, current_user: Dict) -> ContextResponse:
+    """Lógica de actualización de contexto (ejecutada una vez por clave de idempotencia)"""
     try:
         app_id = current_user["app_id"]
         tenant_id = current_user["tenant_id"]
         user_id = current_user.get("user_id")
         
         context_id = str(uuid.uuid4())
+        context_value = json.dumps(request.context_value)
         
         # Calcular fecha de expiración si se especifica
         expires_at = None
@@ -772,10 +2391,15 @@ async def update_context(
                 VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
             """, context_id, tenant_id, app_id, user_id, 
                 request.context_type, request.context_key, 
-                json.dumps(request.context_value), expires_at)
+                context_value, expires_at)
         finally:
             await db_manager.connection_pool.release(conn)
         
+        # Las demás réplicas detectan el cambio por ETag en la siguiente lectura
+        cache_key = (tenant_id, app_id, request.context_type, request.context_key)
+        context_cache.invalidate(cache_key)
+        await context_cache.write_head(cache_key, context_id, context_cache.digest(context_value))
+        
         # Registrar evento
         await db_manager.execute_event_store(
             tenant_id, app_id, "ContextUpdated",
@@ -804,19 +2428,50 @@ async def update_context(
 async def get_context(
     context_type: str,
     context_key: str,
-    current_user: Dict = Depends(auth_manager.authenticate_app)
+    current_user: Dict = Depends(auth_manager.authenticate_app),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match")
 ):
-    """Obtiene contexto específico"""
+    """Obtiene contexto específico
+    
+    Responde con un ETag derivado de la fila vigente; si If-None-Match
+    coincide devuelve 304 sin leer ni serializar el valor.
+    """
     try:
         app_id = current_user["app_id"]
         tenant_id = current_user["tenant_id"]
+        cache_key = (tenant_id, app_id, context_type, context_key)
+        
+        head = await context_cache.read_head(cache_key)
+        if head is None:
+            context_cache.head_misses += 1
+            head = await db_manager.context_head(tenant_id, app_id, context_type, context_key)
+            if head is not None:
+                await context_cache.write_head(cache_key, *head, only_if_absent=True)
+        if head is None:
+            context_cache.invalidate(cache_key)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Context not found"
+            )
+        etag = context_cache.etag(*head)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            context_cache.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        body = context_cache.get_cached(cache_key, etag)
+        if body is not None:
+            context_cache.hits += 1
+            return Response(content=body, media_type="application/json", headers=headers)
         
-        contexts = await db_manager.get_read_model("shared_context", {
+        context_cache.misses += 1
+        contexts, _ = await db_manager.query_read_model("shared_context", {
             "tenant_id": tenant_id,
             "app_id": app_id,
             "context_type": context_type,
             "context_key": context_key
-        })
+        }, limit=1, descending=True)
         
         if not contexts:
             raise HTTPException(
@@ -824,7 +2479,15 @@ async def get_context(
                 detail="Context not found"
             )
         
-        return contexts[0]
+        body = json.dumps(jsonable_encoder(contexts[0])).encode()
+        if str(contexts[0]["context_id"]) != head[0]:
+            # Escritura concurrente o versión publicada obsoleta: el ETag no describe
+            # este cuerpo y la siguiente lectura recalcula la versión en PostgreSQL
+            await context_cache.drop_head(cache_key)
+            return Response(content=body, media_type="application/json",
+                            headers={"Cache-Control": "private, no-cache"})
+        context_cache.store(cache_key, etag, body)
+        return Response(content=body, media_type="application/json", headers=headers)
         
     except HTTPException:
         raise
@@ -930,6 +2593,11 @@ async def health_check():
             services={"error": str(e)}
         )
 
+@app.get("/metrics/admission")
+async def get_admission_metrics():
+    """Métricas del control de admisión: in-flight, retardo de cola y shedding por ruta"""
+    return admission_controller.snapshot()
+
 @app.get("/metrics")
 async def get_metrics(current_user: Dict = Depends(auth_manager.authenticate_app)):
     """Obtiene métricas de la aplicación"""
@@ -946,6 +2614,13 @@ async def get_metrics(current_user: Dict = Depends(auth_manager.authenticate_app
             "current_usage": usage,
             "app_type": current_user["app_profile"]["app_type"],
             "team_specialization": current_user["app_profile"]["team_specialization"],
+            "context_cache": {
+                "hits": context_cache.hits,
+                "misses": context_cache.misses,
+                "not_modified": context_cache.not_modified,
+                "head_misses": context_cache.head_misses,
+                "entries": len(context_cache.entries)
+            },
             "timestamp": datetime.utcnow().isoformat()
         }
         
@@ -962,40 +2637,80 @@ async def get_metrics(current_user: Dict = Depends(auth_manager.authenticate_app
 
 @app.post("/workflows/cross-app")
 async def create_cross_app_workflow(
-    request_data: Dict[str, Any],
+    request: CrossAppWorkflowRequest,
     current_user: Dict = Depends(auth_manager.authenticate_app)
 ):
-    """Crea un workflow que involucra múltiples aplicaciones"""
+    """Crea y ejecuta un workflow que involucra múltiples aplicaciones
+    
+    Los pasos independientes se ejecutan en paralelo (hasta ``max_parallel``)
+    respetando ``depends_on`` y el deadline global. Con ``stream=true`` cada
+    resultado se emite como una línea NDJSON en cuanto el paso termina.
+    """
+    app_id = current_user["app_id"]
+    tenant_id = current_user["tenant_id"]
+    
+    try:
+        workflow_executor.validate(request.steps)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    workflow_id = str(uuid.uuid4())
+    
     try:
-        app_id = current_user["app_id"]
-        tenant_id = current_user["tenant_id"]
-        
-        # Verificar que todas las apps involucradas están activas
-        # En implementación real, verificar en base de datos
-        
-        workflow_id = str(uuid.uuid4())
-        
         # Registrar evento
         await db_manager.execute_event_store(
             tenant_id, app_id, "CrossAppWorkflowCreated",
             {
                 "workflow_id": workflow_id,
-                "workflow_definition": request_data
+                "workflow_definition": request.dict()
             }
         )
-        
-        return {
-            "workflow_id": workflow_id,
-            "status": "created",
-            "message": "Cross-app workflow created successfully"
-        }
-        
     except Exception as e:
         logger.error(f"Error creating cross-app workflow: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create cross-app workflow"
         )
+    
+    started = time.monotonic()
+    
+    async def record_completion(step_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        completed = sum(1 for result in step_results if result["status"] == "completed")
+        summary = {
+            "workflow_id": workflow_id,
+            "status": "completed" if completed == len(step_results) else "partial",
+            "completed_steps": completed,
+            "total_steps": len(step_results),
+            "duration_seconds": round(time.monotonic() - started, 3)
+        }
+        try:
+            await db_manager.execute_event_store(
+                tenant_id, app_id, "CrossAppWorkflowFinished",
+                {**summary, "step_statuses": {r["step_id"]: r["status"] for r in step_results}}
+            )
+        except Exception as e:
+            logger.error(f"Error recording workflow completion: {str(e)}")
+        return summary
+    
+    if request.stream:
+        async def ndjson_generator():
+            step_results = []
+            yield json.dumps({"workflow_id": workflow_id, "status": "running"}) + "\n"
+            async for step_result in workflow_executor.run(request):
+                step_results.append(step_result)
+                yield json.dumps(step_result, default=str) + "\n"
+            yield json.dumps({"summary": await record_completion(step_results)}) + "\n"
+        
+        return StreamingResponse(ndjson_generator(), media_type="application/x-ndjson")
+    
+    step_results = [step_result async for step_result in workflow_executor.run(request)]
+    summary = await record_completion(step_results)
+    
+    return {
+        **summary,
+        "steps": {result["step_id"]: result for result in step_results},
+        "message": "Cross-app workflow executed"
+    }
 
 # =====================================================
 # MANEJO DE ERRORES GLOBAL
@@ -1054,6 +2769,13 @@ API GATEWAY IMPLEMENTADO:
 ✅ Event Sourcing integrado
 ✅ Endpoints para tareas, planes, contexto
 ✅ Workflows cross-app
+✅ Streaming SSE de estado de tareas y planes
+✅ Creación masiva de tareas con cuota reservada por lote
+✅ Read models con lista blanca de columnas y paginación keyset
+✅ Load shedding por retardo de cola (CoDel) con prioridades
+✅ Ejecución paralela de workflows cross-app con dependencias y deadline
+✅ Idempotency-Key con respuestas almacenadas en Redis
+✅ ETag/If-None-Match y caché de respuestas para lecturas de contexto
 ✅ Monitoreo y health checks
 ✅ Manejo de errores global
 ✅ CORS configurado
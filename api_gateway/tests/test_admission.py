@@ -0,0 +1,161 @@
+"""
+Tests del control de admisión CoDel del API Gateway
+"""
+
+import asyncio
+import importlib.util
+import math
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import jwt
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+_spec = importlib.util.spec_from_file_location("api_gateway_main", SERVICE_DIR / "main.py")
+gateway = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(gateway)
+
+TARGET = gateway.ADMISSION_TARGET_DELAY_MS
+INTERVAL = gateway.ADMISSION_INTERVAL_MS / 1000
+FORGED_SECRET = "a-secret-the-gateway-never-issued-tokens-with"
+
+
+def make_scope(path="/tasks/batch", method="POST", token=None):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {"type": "http", "method": method, "path": path, "headers": headers}
+
+
+def make_token(app_id="app", tenant_id="tenant", secret=gateway.JWT_SECRET_KEY):
+    payload = {"app_id": app_id, "tenant_id": tenant_id, "exp": datetime.utcnow() + timedelta(hours=1)}
+    return jwt.encode(payload, secret, algorithm=gateway.JWT_ALGORITHM)
+
+
+@pytest.fixture
+def controller():
+    return gateway.AdmissionController()
+
+
+@pytest.fixture
+def state():
+    return gateway.RouteAdmissionState(max_in_flight=10, max_in_flight_high=10)
+
+
+def test_enters_dropping_after_a_full_interval_above_target(controller, state):
+    controller._update_codel(state, TARGET * 2, now=100.0)
+    assert not state.dropping
+    assert state.first_above_time == pytest.approx(100.0 + INTERVAL)
+
+    controller._update_codel(state, TARGET * 2, now=100.0 + INTERVAL / 2)
+    assert not state.dropping
+
+    controller._update_codel(state, TARGET * 2, now=100.0 + INTERVAL)
+    assert state.dropping
+    assert state.drop_count == 1
+    assert state.drop_next == pytest.approx(100.0 + 2 * INTERVAL)
+
+
+def test_a_single_sample_below_target_resets_the_interval(controller, state):
+    controller._update_codel(state, TARGET * 2, now=100.0)
+    controller._update_codel(state, TARGET / 2, now=100.0 + INTERVAL / 2)
+    controller._update_codel(state, TARGET * 2, now=100.0 + INTERVAL)
+    assert not state.dropping
+    assert state.first_above_time == pytest.approx(100.0 + 2 * INTERVAL)
+
+
+def test_leaves_dropping_when_delay_recovers(controller, state):
+    controller._update_codel(state, TARGET * 2, now=100.0)
+    controller._update_codel(state, TARGET * 2, now=100.0 + INTERVAL)
+    assert state.dropping
+
+    controller._update_codel(state, TARGET / 2, now=101.0)
+    assert not state.dropping
+    assert state.drop_count == 0
+    assert state.first_above_time == 0.0
+
+
+def test_probes_follow_interval_over_sqrt_count(controller, state):
+    state.dropping = True
+    state.drop_count = 1
+    state.drop_next = 100.0 + INTERVAL
+
+    assert not controller._probe_due(state, 100.0)
+    assert controller._probe_due(state, 100.0 + INTERVAL)
+    assert state.drop_count == 2
+    assert state.drop_next == pytest.approx(100.0 + INTERVAL + INTERVAL / math.sqrt(2))
+
+    now = state.drop_next
+    assert controller._probe_due(state, now)
+    assert state.drop_next - now == pytest.approx(INTERVAL / math.sqrt(3))
+
+
+def test_idle_dropping_route_recovers_from_loop_lag(controller):
+    scope = make_scope()
+    key = controller.route_key(scope)
+    state = controller.routes[key] = gateway.RouteAdmissionState(10, 10)
+    state.dropping = True
+    state.drop_count = 1
+    state.drop_next = float("inf")
+    controller.loop_lag_ms = 0.0
+
+    admitted, _, priority, holds_slot = asyncio.run(controller.admit(scope))
+
+    assert (admitted, priority, holds_slot) == (True, "low", True)
+    assert not state.dropping
+
+
+def test_low_priority_is_shed_while_dropping(controller):
+    scope = make_scope()
+    key = controller.route_key(scope)
+    state = controller.routes[key] = gateway.RouteAdmissionState(1, 10)
+    state.dropping = True
+    state.drop_count = 1
+    state.drop_next = float("inf")
+    # Con el slot ocupado la ruta no puede medir el retardo sin cola
+    asyncio.run(state.slots["low"].acquire())
+
+    admitted, _, _, _ = asyncio.run(controller.admit(scope))
+
+    assert not admitted
+    assert state.shed["low"] == 1
+
+
+def test_priority_comes_from_a_verified_jwt(controller, monkeypatch):
+    monkeypatch.setattr(gateway, "ADMISSION_HIGH_PRIORITY_APPS", frozenset({"vip-app"}))
+    monkeypatch.setattr(gateway, "ADMISSION_HIGH_PRIORITY_TENANTS", frozenset({"vip-tenant"}))
+
+    assert controller.priority_class(make_scope(token=make_token(app_id="vip-app"))) == "high"
+    assert controller.priority_class(make_scope(token=make_token(tenant_id="vip-tenant"))) == "high"
+    assert controller.priority_class(make_scope(token=make_token())) == "low"
+    assert controller.priority_class(make_scope(token=make_token("vip-app", secret=FORGED_SECRET))) == "low"
+    assert controller.priority_class(make_scope()) == "low"
+
+
+def test_priority_header_is_ignored(controller):
+    scope = make_scope()
+    scope["headers"].append((b"x-priority", b"high"))
+    assert controller.priority_class(scope) == "low"
+
+
+def test_high_priority_is_capped_per_route(controller, monkeypatch):
+    monkeypatch.setattr(gateway, "ADMISSION_HIGH_PRIORITY_APPS", frozenset({"vip-app"}))
+    monkeypatch.setattr(gateway, "ADMISSION_MAX_IN_FLIGHT_HIGH_PER_ROUTE", 1)
+    monkeypatch.setattr(gateway, "ADMISSION_MAX_QUEUE_WAIT_MS", 10)
+    scope = make_scope(token=make_token(app_id="vip-app"))
+
+    async def admit_twice():
+        return await controller.admit(scope), await controller.admit(scope)
+
+    (first, key, priority, holds_slot), (second, _, _, _) = asyncio.run(admit_twice())
+
+    assert (first, priority, holds_slot) == (True, "high", True)
+    assert not second
+    assert controller.routes[key].shed["high"] == 1
+
+    controller.release(key, priority, holds_slot)
+    assert controller.routes[key].in_flight == 0
+
+
+def test_route_key_uses_the_route_template(controller):
+    assert controller.route_key(make_scope("/tasks/123", "GET")) == "GET /tasks/{task_id}"
+    assert ("GET", "/tasks/123") in controller.route_cache
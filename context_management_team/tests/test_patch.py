@@ -0,0 +1,283 @@
+"""
+Tests de las actualizaciones por delta: JSON Patch (RFC 6902), merge-patch
+(RFC 7386) y compactación de deltas en snapshots
+"""
+
+import asyncio
+import importlib.util
+import json
+import uuid
+from pathlib import Path
+
+import fakeredis
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+_spec = importlib.util.spec_from_file_location("context_management_main", SERVICE_DIR / "main.py")
+context_main = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(context_main)
+
+apply_json_patch = context_main.apply_json_patch
+apply_merge_patch = context_main.apply_merge_patch
+JsonPatchError = context_main.JsonPatchError
+
+
+# RFC 6902, apéndice A
+@pytest.mark.parametrize("document, operations, expected", [
+    ({"foo": "bar"}, [{"op": "add", "path": "/baz", "value": "qux"}], {"baz": "qux", "foo": "bar"}),
+    ({"foo": ["bar", "baz"]}, [{"op": "add", "path": "/foo/1", "value": "qux"}], {"foo": ["bar", "qux", "baz"]}),
+    ({"baz": "qux", "foo": "bar"}, [{"op": "remove", "path": "/baz"}], {"foo": "bar"}),
+    ({"foo": ["bar", "qux", "baz"]}, [{"op": "remove", "path": "/foo/1"}], {"foo": ["bar", "baz"]}),
+    ({"baz": "qux", "foo": "bar"}, [{"op": "replace", "path": "/baz", "value": "boo"}], {"baz": "boo", "foo": "bar"}),
+    (
+        {"foo": {"bar": "baz", "waldo": "fred"}, "qux": {"corge": "grault"}},
+        [{"op": "move", "from": "/foo/waldo", "path": "/qux/thud"}],
+        {"foo": {"bar": "baz"}, "qux": {"corge": "grault", "thud": "fred"}},
+    ),
+    (
+        {"foo": ["all", "grass", "cows", "eat"]},
+        [{"op": "move", "from": "/foo/1", "path": "/foo/3"}],
+        {"foo": ["all", "cows", "eat", "grass"]},
+    ),
+    (
+        {"baz": "qux", "foo": ["a", 2, "c"]},
+        [{"op": "test", "path": "/baz", "value": "qux"}, {"op": "test", "path": "/foo/1", "value": 2}],
+        {"baz": "qux", "foo": ["a", 2, "c"]},
+    ),
+    ({"foo": "bar"}, [{"op": "add", "path": "/child", "value": {"grandchild": {}}}],
+     {"foo": "bar", "child": {"grandchild": {}}}),
+    ({"foo": ["bar"]}, [{"op": "add", "path": "/foo/-", "value": ["abc", "def"]}], {"foo": ["bar", ["abc", "def"]]}),
+    ({"/": 9, "~1": 10}, [{"op": "test", "path": "/~01", "value": 10}], {"/": 9, "~1": 10}),
+    ({"foo": 1}, [{"op": "copy", "from": "/foo", "path": "/bar"}], {"foo": 1, "bar": 1}),
+])
+def test_json_patch_rfc_examples(document, operations, expected):
+    assert apply_json_patch(document, operations) == expected
+
+
+@pytest.mark.parametrize("document, operations", [
+    ({"baz": "qux"}, [{"op": "test", "path": "/baz", "value": "bar"}]),
+    ({"foo": "bar"}, [{"op": "add", "path": "/baz/bat", "value": "qux"}]),
+    ({"foo": [1]}, [{"op": "add", "path": "/foo/01", "value": 2}]),
+    ({"foo": [1]}, [{"op": "add", "path": "/foo/5", "value": 2}]),
+    ({"a": True}, [{"op": "test", "path": "/a", "value": 1}]),
+    ({"a": {"b": 1}}, [{"op": "move", "from": "/a", "path": "/a/b/c"}]),
+    ({"a": 1}, [{"op": "replace", "path": "/b", "value": 1}]),
+    ({"a": 1}, [{"op": "remove", "path": "a"}]),
+    ({"a": 1}, [{"op": "frobnicate", "path": "/a"}]),
+])
+def test_json_patch_errors(document, operations):
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(document, operations)
+
+
+def test_json_patch_is_atomic():
+    document = {"a": {"b": [1]}}
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(document, [
+            {"op": "add", "path": "/a/b/-", "value": 2},
+            {"op": "test", "path": "/missing", "value": 0},
+        ])
+    assert document == {"a": {"b": [1]}}
+
+
+# RFC 7386, apéndice A
+@pytest.mark.parametrize("target, patch, expected", [
+    ({"a": "b"}, {"a": "c"}, {"a": "c"}),
+    ({"a": "b"}, {"b": "c"}, {"a": "b", "b": "c"}),
+    ({"a": "b"}, {"a": None}, {}),
+    ({"a": "b", "b": "c"}, {"a": None}, {"b": "c"}),
+    ({"a": ["b"]}, {"a": "c"}, {"a": "c"}),
+    ({"a": "c"}, {"a": ["b"]}, {"a": ["b"]}),
+    ({"a": {"b": "c"}}, {"a": {"b": "d", "c": None}}, {"a": {"b": "d"}}),
+    ({"a": [{"b": "c"}]}, {"a": [1]}, {"a": [1]}),
+    (["a", "b"], ["c", "d"], ["c", "d"]),
+    ({"a": "b"}, ["c"], ["c"]),
+    ({"a": "foo"}, None, None),
+    ({"a": "foo"}, "bar", "bar"),
+    ({"e": None}, {"a": 1}, {"e": None, "a": 1}),
+    ([1, 2], {"a": "b", "c": None}, {"a": "b"}),
+    ({}, {"a": {"bb": {"ccc": None}}}, {"a": {"bb": {}}}),
+])
+def test_merge_patch_rfc_examples(target, patch, expected):
+    assert apply_merge_patch(target, patch) == expected
+
+
+def test_merge_patch_does_not_mutate_the_target():
+    target = {"a": {"b": 1}}
+    apply_merge_patch(target, {"a": {"c": 2}})
+    assert target == {"a": {"b": 1}}
+
+
+class FakeConnection:
+    """Lo justo de asyncpg para ``patch_context`` sobre un único contexto"""
+
+    def __init__(self, db: "FakeDatabase"):
+        self.db = db
+
+    def transaction(self):
+        return self.db
+
+    async def fetchrow(self, query, *args):
+        context = self.db.contexts.get(args[0])
+        if "SELECT context_type, version" in query:
+            if context is None or context["tenant_id"] != args[1]:
+                return None
+            return {key: context[key] for key in ("context_type", "version", "snapshot_version", "context_hash")}
+        blob = self.db.blobs[context["context_hash"]]
+        return {"content": blob["content"], "content_compressed": blob["content_compressed"]}
+
+    async def fetch(self, query, *args):
+        if "FROM context_deltas" in query:
+            return [delta for (context_id, version), delta in sorted(self.db.deltas.items())
+                    if context_id == args[0] and version > args[1]]
+        if "DELETE FROM context_blobs" in query:
+            orphaned = [digest for digest in args[0] if self.db.blobs.get(digest, {}).get("ref_count", 1) <= 0]
+            for digest in orphaned:
+                del self.db.blobs[digest]
+            return [{"digest": digest} for digest in orphaned]
+        raise AssertionError(query)
+
+    async def fetchval(self, query, *args):
+        context = self.db.contexts[args[0]]
+        if "UPDATE shared_contexts" in query:
+            if context["version"] != args[2]:
+                return None
+            context["version"] += 1
+            return context["version"]
+        return context["version"]
+
+    async def execute(self, query, *args):
+        if "INSERT INTO context_blobs" in query:
+            digest, content, compressed, _ = args
+            blob = self.db.blobs.setdefault(digest, {"content": content, "content_compressed": compressed,
+                                                     "ref_count": 0})
+            blob["ref_count"] += 1
+        elif "UPDATE shared_contexts SET context_hash" in query:
+            self.db.contexts[args[0]].update(context_hash=args[1], snapshot_version=args[2])
+        elif "DELETE FROM context_deltas" in query:
+            for key in [key for key in self.db.deltas if key[0] == args[0] and key[1] < args[1]]:
+                del self.db.deltas[key]
+        elif "UPDATE context_blobs" in query:
+            for digest in args[0]:
+                self.db.blobs[digest]["ref_count"] -= 1
+        elif "INSERT INTO context_deltas" in query:
+            context_id, version, patch_format, patch, size_bytes, _ = args
+            self.db.deltas[(context_id, version)] = {
+                "patch_format": patch_format, "patch": patch, "size_bytes": size_bytes
+            }
+        else:
+            raise AssertionError(query)
+
+
+class FakeDatabase:
+    """Pool con un contexto sembrado; también hace de transacción (sin rollback)"""
+
+    def __init__(self, content):
+        canonical, digest = context_main.content_digest(content)
+        self.context_id = str(uuid.uuid4())
+        self.blobs = {digest: {"content": canonical, "content_compressed": None, "ref_count": 1}}
+        self.contexts = {self.context_id: {
+            "tenant_id": "tenant", "context_type": "conversation", "version": 1,
+            "snapshot_version": 1, "context_hash": digest,
+        }}
+        self.deltas = {}
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return FakeConnection(self)
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def current_content(self):
+        """Snapshot más los deltas posteriores, como lo reconstruye una lectura"""
+        context = self.contexts[self.context_id]
+        content = json.loads(self.blobs[context["context_hash"]]["content"])
+        for (_, version), delta in sorted(self.deltas.items()):
+            if version > context["snapshot_version"]:
+                content = context_main.apply_patch(content, delta["patch_format"], json.loads(delta["patch"]))
+        return content
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(context_main, "CONTEXT_COMPACTION_DELTAS", 4)
+    server = fakeredis.FakeServer()
+    service = context_main.ContextManagerService()
+    service.redis_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    service.redis_binary = fakeredis.FakeAsyncRedis(server=server)
+    return service
+
+
+def patch_request(version, patch, patch_format="json_patch"):
+    return context_main.ContextPatchRequest(
+        tenant_id="tenant", expected_version=version, patch_format=patch_format, patch=patch
+    )
+
+
+def test_deltas_are_compacted_into_a_snapshot(service):
+    db = service.db_pool = FakeDatabase({"messages": ["m" * 500]})
+    expected = {"messages": ["m" * 500]}
+
+    async def run():
+        results = []
+        for version in range(1, 9):
+            message = f"reply {version}"
+            results.append(await service.patch_context(db.context_id, patch_request(
+                version, [{"op": "add", "path": "/messages/-", "value": message}]
+            )))
+            expected["messages"].append(message)
+            assert db.current_content() == expected
+        return results
+
+    results = asyncio.run(run())
+
+    assert [result["version"] for result in results] == list(range(2, 10))
+    # Cada CONTEXT_COMPACTION_DELTAS versiones el contenido pasa a un snapshot
+    assert [result["compacted"] for result in results] == [False, False, False, True] * 2
+    assert db.contexts[db.context_id]["snapshot_version"] == 9
+    assert db.deltas == {}
+    # El snapshot anterior queda sin referencias y se borra
+    assert list(db.blobs) == [db.contexts[db.context_id]["context_hash"]]
+
+
+def test_large_deltas_compact_early(service):
+    db = service.db_pool = FakeDatabase({"text": "short"})
+
+    result = asyncio.run(service.patch_context(db.context_id, patch_request(
+        1, {"text": "x" * 1000}, patch_format="merge_patch"
+    )))
+
+    assert result["compacted"]
+    assert db.current_content() == {"text": "x" * 1000}
+
+
+def test_stale_version_conflicts(service):
+    db = service.db_pool = FakeDatabase({"a": "x" * 500})
+
+    async def run():
+        await service.patch_context(db.context_id, patch_request(1, {"b": 1}, patch_format="merge_patch"))
+        await service.patch_context(db.context_id, patch_request(1, {"b": 2}, patch_format="merge_patch"))
+
+    with pytest.raises(context_main.ContextVersionConflict) as excinfo:
+        asyncio.run(run())
+    assert excinfo.value.current_version == 2
+    assert db.current_content() == {"a": "x" * 500, "b": 1}
+
+
+def test_invalid_patch_leaves_the_context_untouched(service):
+    db = service.db_pool = FakeDatabase({"a": 1})
+
+    with pytest.raises(JsonPatchError):
+        asyncio.run(service.patch_context(db.context_id, patch_request(1, [{"op": "remove", "path": "/b"}])))
+
+    assert db.contexts[db.context_id]["version"] == 1
+    assert db.deltas == {}
+
+
+def test_unknown_context_returns_none(service):
+    service.db_pool = FakeDatabase({"a": 1})
+    assert asyncio.run(service.patch_context(str(uuid.uuid4()), patch_request(1, []))) is None
+    assert asyncio.run(service.patch_context("not-a-uuid", patch_request(1, []))) is None
@@ -0,0 +1,396 @@
+"""
+Prueba de carga determinista del MCP Server
+
+Levanta la aplicación real (``MCPServer`` con sus rutas, cachés, bulkheads,
+conectores y write-behind) sobre fakeredis y un sustituto de PostgreSQL en
+memoria, y la ataca en proceso con httpx. La latencia de cada proveedor
+simulado sale de un perfil por herramienta (lognormal con mediana, dispersión,
+tasa de errores y de bloqueos) instalado en ``MCPServer.upstream_latency``.
+
+La carga es de lazo abierto: llegadas de Poisson a la tasa objetivo, repartidas
+entre equipos según su peso y entre las herramientas de cada equipo. Con la
+misma semilla se generan las mismas llegadas, parámetros y latencias.
+
+Reporta por herramienta throughput, p50/p95/p99, errores, rechazos por
+backpressure (503), hits de caché y saturación del bulkhead (ocupación media
+y máxima, rechazos y timeouts de cola).
+
+Uso (desde mcp_server/):
+    python -m benchmarks.load_test --rps 50 --duration 30 [--seed 7] [--time-scale 0.2]
+        [--batch-size 10] [--key-space 50] [--profile perfil.json] [--workload mezcla.json]
+        [--ignore-provider-limits] [--output informe.json]
+
+Un perfil es un JSON ``{clave: {"median": s, "sigma": s, "error_rate": p,
+"stall_rate": p, "stall_seconds": s}}``; la clave es el tool_id (o
+``openai_chat.token`` para cada token) y ``"*"`` aplica a todas. Sin
+``median`` se usa la latencia nominal de la herramienta. Una mezcla es un JSON
+``{equipo: {"weight": w, "tools": {tool_id: w}}}``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import fakeredis.aioredis
+import httpx
+import numpy as np
+
+import main
+from benchmarks.validation_benchmark import sample_payloads
+
+# Mezcla por defecto: peso del equipo y peso de cada herramienta dentro del equipo
+DEFAULT_WORKLOAD = {
+    "research": {"weight": 3, "tools": {"web_search": 4, "news_search": 2, "openai_chat": 3,
+                                        "github_api": 1, "social_media_search": 1}},
+    "marketing": {"weight": 3, "tools": {"social_media_search": 2, "openai_chat": 2, "send_email": 2,
+                                         "openai_image": 1, "web_search": 2, "salesforce_api": 1}},
+    "code_generation": {"weight": 2, "tools": {"openai_chat": 3, "github_api": 2, "git_operations": 1}},
+    "sales": {"weight": 2, "tools": {"salesforce_api": 3, "google_maps": 1, "send_email": 2, "web_search": 1}},
+    "cloud_services": {"weight": 1, "tools": {"aws_cli": 2, "docker_operations": 2, "git_operations": 1}},
+    "finance": {"weight": 1, "tools": {"financial_data": 1}},
+}
+DEFAULT_PROFILE = {"*": {"sigma": 0.35, "error_rate": 0.01}}
+
+
+class UpstreamError(Exception):
+    """Error simulado del proveedor externo"""
+
+
+@dataclass
+class UpstreamProfile:
+    """Distribución de latencia y fallos de una llamada externa"""
+    median: Optional[float] = None  # None = latencia nominal de la herramienta
+    sigma: float = 0.0  # dispersión lognormal; 0 = latencia fija
+    error_rate: float = 0.0
+    stall_rate: float = 0.0  # llamadas que se quedan colgadas (ejercitan timeouts)
+    stall_seconds: float = 30.0
+
+
+class LatencyModel:
+    """Sustituto de ``MCPServer.upstream_latency`` con un generador sembrado por clave
+
+    Cada clave tiene su propio generador, así que la secuencia de latencias de
+    una herramienta no depende de cómo se intercalen las demás.
+    """
+
+    def __init__(self, profiles: Dict[str, Dict[str, float]], seed: int, time_scale: float = 1.0):
+        self.profiles = profiles
+        self.seed = seed
+        self.time_scale = time_scale
+        self.generators: Dict[str, random.Random] = {}
+        self.resolved: Dict[str, UpstreamProfile] = {}
+
+    def profile(self, key: str) -> UpstreamProfile:
+        if key not in self.resolved:
+            self.resolved[key] = UpstreamProfile(**{**self.profiles.get("*", {}), **self.profiles.get(key, {})})
+        return self.resolved[key]
+
+    async def __call__(self, key: str, seconds: float):
+        profile = self.profile(key)
+        rng = self.generators.setdefault(key, random.Random(f"{self.seed}:{key}"))
+        median = seconds if profile.median is None else profile.median
+        latency = median * math.exp(profile.sigma * rng.gauss(0, 1)) if profile.sigma else median
+        roll = rng.random()
+        if roll < profile.stall_rate:
+            latency = profile.stall_seconds
+        await asyncio.sleep(latency * self.time_scale)
+        if profile.stall_rate <= roll < profile.stall_rate + profile.error_rate:
+            raise UpstreamError(f"Error simulado del proveedor ({key})")
+
+
+class FakeConnection:
+    """Conexión asyncpg mínima: COPY, transacciones y consultas vacías"""
+
+    def __init__(self, pool: "FakePostgresPool"):
+        self.pool = pool
+
+    def transaction(self):
+        return FakePostgresPool._Transaction()
+
+    async def copy_records_to_table(self, table: str, records: List[tuple], columns: List[str]):
+        await asyncio.sleep(self.pool.latency)
+        self.pool.rows[table] = self.pool.rows.get(table, 0) + len(records)
+        self.pool.copies += 1
+
+    async def execute(self, query: str, *args) -> str:
+        await asyncio.sleep(self.pool.latency)
+        return "OK"
+
+    async def fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        await asyncio.sleep(self.pool.latency)
+        return []
+
+    async def fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        await asyncio.sleep(self.pool.latency)
+        return None
+
+
+class FakePostgresPool:
+    """Sustituto de ``asyncpg.Pool`` que cuenta las filas escritas por tabla"""
+
+    def __init__(self, latency: float = 0.002):
+        self.latency = latency
+        self.rows: Dict[str, int] = {}
+        self.copies = 0
+
+    class _Transaction:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class _Acquire:
+        def __init__(self, pool: "FakePostgresPool"):
+            self.connection = FakeConnection(pool)
+
+        async def __aenter__(self) -> FakeConnection:
+            return self.connection
+
+        async def __aexit__(self, *exc):
+            return False
+
+    def acquire(self):
+        return self._Acquire(self)
+
+    async def close(self):
+        pass
+
+
+@dataclass
+class Arrival:
+    at: float
+    team_id: str
+    invocations: List[Tuple[str, Dict[str, Any]]]
+
+
+@dataclass
+class ToolStats:
+    latencies: List[float] = field(default_factory=list)
+    ok: int = 0
+    errors: int = 0
+    rejected: int = 0
+    cache_hits: int = 0
+    saturation: List[float] = field(default_factory=list)
+
+
+def check_workload(workload: Dict[str, Any], tools: Dict[str, Any]):
+    for team_id, mix in workload.items():
+        for tool_id in mix["tools"]:
+            if tool_id not in tools:
+                raise SystemExit(f"Herramienta desconocida en la mezcla: {tool_id}")
+            if team_id not in tools[tool_id].team_access:
+                raise SystemExit(f"El equipo {team_id} no tiene acceso a {tool_id}")
+
+
+def build_schedule(workload: Dict[str, Any], tools: Dict[str, Any], rps: float, duration: float,
+                   batch_size: int, key_space: int, seed: int) -> List[Arrival]:
+    """Llegadas de Poisson a ``rps`` invocaciones/segundo; con lotes, cada llegada agrupa ``batch_size``"""
+    rng = random.Random(seed)
+    teams = sorted(workload)
+    team_weights = [workload[team]["weight"] for team in teams]
+    templates = {tool_id: sample_payloads(tool.parameters_schema)[0] for tool_id, tool in tools.items()}
+
+    def parameters(tool_id: str) -> Dict[str, Any]:
+        # Los textos libres varían dentro de ``key_space`` valores: controla la tasa de hits de caché
+        schema = tools[tool_id].parameters_schema.get("properties", {})
+        params = dict(templates[tool_id])
+        for name, value in params.items():
+            prop = schema.get(name, {})
+            if prop.get("type") == "string" and "format" not in prop and "enum" not in prop:
+                params[name] = f"{value} {rng.randrange(key_space)}"
+        return params
+
+    schedule, now = [], 0.0
+    while True:
+        now += rng.expovariate(rps / batch_size)
+        if now >= duration:
+            return schedule
+        team_id = rng.choices(teams, team_weights)[0]
+        mix = workload[team_id]["tools"]
+        tool_ids = rng.choices(sorted(mix), [mix[tool_id] for tool_id in sorted(mix)], k=batch_size)
+        schedule.append(Arrival(now, team_id, [(tool_id, parameters(tool_id)) for tool_id in tool_ids]))
+
+
+async def setup_server(args: argparse.Namespace, profiles: Dict[str, Any]) -> Tuple[main.MCPServer, FakePostgresPool]:
+    server = main.MCPServer()
+    server.redis = fakeredis.aioredis.FakeRedis()
+    server.result_cache.redis = server.redis
+    server.job_queue.redis = server.redis
+    server.analytics.redis = server.redis
+    pool = FakePostgresPool(args.db_latency)
+    server.db = pool
+    await server.write_behind.start(pool)
+    await server.load_tools()
+    await server.connectors.start(server.redis)
+    if args.ignore_provider_limits:
+        for connector in server.connectors.connectors.values():
+            connector.governor.rate = connector.governor.burst = 1e9
+    server.upstream_latency = LatencyModel(profiles, args.seed, args.time_scale)
+    return server, pool
+
+
+async def sample_saturation(server: main.MCPServer, stats: Dict[str, ToolStats], interval: float):
+    while True:
+        for tool_id, bulkhead in server.bulkheads.items():
+            stats.setdefault(tool_id, ToolStats()).saturation.append(bulkhead.in_flight / bulkhead.max_concurrency)
+        await asyncio.sleep(interval)
+
+
+async def send(client: httpx.AsyncClient, arrival: Arrival, stats: Dict[str, ToolStats]):
+    start = time.perf_counter()
+    if len(arrival.invocations) == 1:
+        tool_id, params = arrival.invocations[0]
+        response = await client.post("/execute", json={
+            "tool_id": tool_id, "parameters": params, "team_id": arrival.team_id, "agent_type": "load_test"
+        })
+        body = response.json()
+        outcomes = [(tool_id, response.status_code, body)]
+    else:
+        response = await client.post("/execute/batch", json={
+            "team_id": arrival.team_id, "agent_type": "load_test",
+            "invocations": [{"tool_id": tool_id, "parameters": params} for tool_id, params in arrival.invocations]
+        })
+        results = response.json().get("results", []) if response.status_code == 200 else []
+        outcomes = [
+            (tool_id, response.status_code, results[index] if index < len(results) else {})
+            for index, (tool_id, _) in enumerate(arrival.invocations)
+        ]
+    elapsed = time.perf_counter() - start
+
+    for tool_id, status, body in outcomes:
+        tool_stats = stats.setdefault(tool_id, ToolStats())
+        tool_stats.latencies.append(elapsed)
+        # En lotes los rechazos por backpressure llegan como error de la invocación
+        if status == 503 or (status == 200 and "reintentar en" in str(body.get("error") or "")):
+            tool_stats.rejected += 1
+        elif status == 200 and body.get("success"):
+            tool_stats.ok += 1
+            tool_stats.cache_hits += body.get("cache_status") in ("hit", "stale", "semantic")
+        else:
+            tool_stats.errors += 1
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    profiles = json.load(open(args.profile, encoding="utf-8")) if args.profile else DEFAULT_PROFILE
+    workload = json.load(open(args.workload, encoding="utf-8")) if args.workload else DEFAULT_WORKLOAD
+    server, pool = await setup_server(args, profiles)
+    check_workload(workload, server.tools)
+    schedule = build_schedule(workload, server.tools, args.rps, args.duration,
+                              args.batch_size, args.key_space, args.seed)
+
+    stats: Dict[str, ToolStats] = {}
+    sampler = asyncio.create_task(sample_saturation(server, stats, args.sample_interval))
+    transport = httpx.ASGITransport(app=server.app)
+    max_lag = 0.0
+    async with httpx.AsyncClient(transport=transport, base_url="http://mcp", timeout=None) as client:
+        started = time.perf_counter()
+        pending = []
+        for arrival in schedule:
+            delay = arrival.at - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+            pending.append(asyncio.create_task(send(client, arrival, stats)))
+        await asyncio.gather(*pending)
+        elapsed = time.perf_counter() - started
+
+    sampler.cancel()
+    await asyncio.gather(sampler, return_exceptions=True)
+    await server.write_behind.stop()
+    await server.connectors.close()
+    return report(server, pool, stats, args, elapsed, max_lag)
+
+
+def report(server: main.MCPServer, pool: FakePostgresPool, stats: Dict[str, ToolStats],
+           args: argparse.Namespace, elapsed: float, max_lag: float) -> Dict[str, Any]:
+    tools = {}
+    for tool_id, tool_stats in sorted(stats.items()):
+        if not tool_stats.latencies:
+            continue
+        p50, p95, p99 = np.percentile(tool_stats.latencies, [50, 95, 99])
+        bulkhead = server.bulkheads[tool_id].snapshot()
+        tools[tool_id] = {
+            "requests": len(tool_stats.latencies),
+            "ok": tool_stats.ok,
+            "errors": tool_stats.errors,
+            "rejected": tool_stats.rejected,
+            "cache_hit_rate": round(tool_stats.cache_hits / tool_stats.ok, 4) if tool_stats.ok else 0.0,
+            "throughput": round(tool_stats.ok / elapsed, 2),
+            "p50": round(float(p50), 4),
+            "p95": round(float(p95), 4),
+            "p99": round(float(p99), 4),
+            "saturation_mean": round(float(np.mean(tool_stats.saturation)), 4) if tool_stats.saturation else 0.0,
+            "saturation_peak": round(bulkhead["peak_in_flight"] / bulkhead["max_concurrency"], 4),
+            "peak_waiting": bulkhead["peak_waiting"],
+            "queue_timeouts": bulkhead["queue_timeouts"],
+        }
+    completed = sum(tool["ok"] for tool in tools.values())
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "elapsed": round(elapsed, 3),
+        "requests": sum(tool["requests"] for tool in tools.values()),
+        "throughput": round(completed / elapsed, 2),
+        "scheduler_max_lag": round(max_lag, 4),
+        "tools": tools,
+        "write_behind": server.write_behind.snapshot(),
+        "postgres_rows": pool.rows,
+    }
+
+
+def print_report(result: Dict[str, Any]):
+    config = result["config"]
+    print(f"{result['requests']} invocaciones en {result['elapsed']:.1f}s "
+          f"(objetivo {config['rps']} rps, lotes de {config['batch_size']}, semilla {config['seed']}): "
+          f"{result['throughput']:.1f} ok/s, retraso máximo del planificador {result['scheduler_max_lag'] * 1000:.0f}ms")
+    header = (f"{'herramienta':<22}{'reqs':>6}{'ok/s':>8}{'err':>6}{'503':>6}{'hits':>7}"
+              f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'sat med':>9}{'sat max':>9}{'cola':>6}")
+    print(header)
+    print("-" * len(header))
+    for tool_id, row in result["tools"].items():
+        print(f"{tool_id:<22}{row['requests']:>6}{row['throughput']:>8.1f}{row['errors']:>6}{row['rejected']:>6}"
+              f"{row['cache_hit_rate']:>7.0%}{row['p50'] * 1000:>9.0f}{row['p95'] * 1000:>9.0f}"
+              f"{row['p99'] * 1000:>9.0f}{row['saturation_mean']:>9.2f}{row['saturation_peak']:>9.2f}"
+              f"{row['peak_waiting']:>6}")
+    print("-" * len(header))
+    print(f"write-behind: {result['write_behind']}  filas PostgreSQL: {result['postgres_rows']}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=50, help="invocaciones/segundo objetivo")
+    parser.add_argument("--duration", type=float, default=30, help="segundos de llegadas")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=1, help=">1 usa /execute/batch")
+    parser.add_argument("--key-space", type=int, default=50, help="valores distintos por parámetro de texto")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="factor sobre las latencias simuladas")
+    parser.add_argument("--db-latency", type=float, default=0.002, help="segundos por operación en PostgreSQL")
+    parser.add_argument("--sample-interval", type=float, default=0.05, help="muestreo de saturación en segundos")
+    parser.add_argument("--profile", help="JSON con perfiles de latencia por herramienta")
+    parser.add_argument("--workload", help="JSON con la mezcla de equipos y herramientas")
+    parser.add_argument("--ignore-provider-limits", action="store_true",
+                        help="desactivar los gobernadores de tasa de los proveedores")
+    parser.add_argument("--output", help="guardar el informe en JSON para comparar ejecuciones")
+    parser.add_argument("--verbose", action="store_true", help="mostrar los logs del servidor")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger("main").setLevel(logging.CRITICAL)
+        logging.getLogger("connectors").setLevel(logging.CRITICAL)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
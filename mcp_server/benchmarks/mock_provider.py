@@ -0,0 +1,77 @@
+"""
+Proveedor externo simulado para probar conectores y gobernadores de tasa
+
+Responde a cualquier ruta con un JSON de eco tras una latencia configurable y
+aplica su propio límite de tasa: al superarlo devuelve 429 con Retry-After,
+como los proveedores reales. Expone ``GET /_stats`` con peticiones servidas y
+rechazadas.
+
+Uso (desde mcp_server/):
+    python -m benchmarks.mock_provider --port 9100 --rate 5 --burst 10 --latency 0.05
+    MCP_PROVIDER_OPENAI_URL=http://localhost:9100 python -m uvicorn main:app --port 8004  # openai_chat usa el simulador
+"""
+
+import argparse
+import asyncio
+import math
+import time
+
+from aiohttp import web
+
+
+class ProviderLimiter:
+    """Token bucket local del proveedor simulado"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.ts = time.monotonic()
+
+    def take(self) -> float:
+        """0 si hay capacidad; si no, segundos hasta el siguiente token"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.ts) * self.rate)
+        self.ts = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+def create_app(rate: float = 5, burst: int = 10, latency: float = 0.05) -> web.Application:
+    limiter = ProviderLimiter(rate, burst)
+    stats = {"served": 0, "throttled": 0}
+
+    async def handle(request: web.Request) -> web.Response:
+        if request.path == "/_stats":
+            return web.json_response(stats)
+        wait = limiter.take()
+        if wait:
+            stats["throttled"] += 1
+            return web.json_response(
+                {"error": "rate_limited"}, status=429, headers={"Retry-After": str(max(1, math.ceil(wait)))}
+            )
+        await asyncio.sleep(latency)
+        stats["served"] += 1
+        body = await request.json() if request.can_read_body else None
+        return web.json_response({"path": request.path, "method": request.method, "echo": body})
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_route("*", "/{tail:.*}", handle)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--rate", type=float, default=5, help="peticiones/segundo permitidas")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="segundos por respuesta")
+    args = parser.parse_args()
+    web.run_app(create_app(args.rate, args.burst, args.latency), port=args.port)
+
+
+if __name__ == "__main__":
+    main()
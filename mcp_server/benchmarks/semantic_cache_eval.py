@@ -0,0 +1,184 @@
+"""
+Evaluación offline de la caché semántica de openai_chat
+
+Para cada par (prompt cacheado, consulta) se sabe si la respuesta cacheada
+sería válida. El harness recorre varios umbrales y reporta precisión (hits
+correctos / hits), recall (pares equivalentes servidos desde caché), tasa de
+hits y coste de búsqueda. También mide cuántos vecinos reales pierde el
+índice LSH frente a una búsqueda exhaustiva.
+
+Sin ``--dataset`` se genera un conjunto sintético con plantillas reales de
+los equipos. Además de temas no cacheados incluye negativos cercanos: el
+mismo prompt con otro número, otra fecha, una negación u otra entidad, que
+comparten casi todo el texto pero no admiten la misma respuesta. Un dataset propio es un JSONL con ``cached``, ``query`` y
+``equivalent`` (bool) por línea.
+
+Uso (desde mcp_server/):
+    python -m benchmarks.semantic_cache_eval [--dataset pares.jsonl] [--thresholds 0.8,0.85,0.9,0.95]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from semantic_cache import SemanticCache, guard_tokens
+
+# (plantilla, paráfrasis equivalentes) con un hueco {x} para el tema
+TEMPLATES = [
+    ("Resume el siguiente informe de {x} en tres puntos",
+     ["Resume el siguiente informe de {x} en 3 puntos",
+      "Resume este informe de {x} en tres puntos",
+      "resume el siguiente informe de {x} en tres puntos."]),
+    ("Escribe un email de seguimiento para el cliente sobre {x}",
+     ["Escribe un correo de seguimiento para el cliente sobre {x}",
+      "Redacta un email de seguimiento para el cliente sobre {x}"]),
+    ("Genera cinco ideas de campaña para {x}",
+     ["Genera 5 ideas de campaña para {x}",
+      "Genera cinco ideas de campaña de marketing para {x}"]),
+    ("Explica los riesgos principales de {x}",
+     ["Explica cuáles son los riesgos principales de {x}",
+      "Explica los principales riesgos de {x}"]),
+]
+TOPICS = [
+    "ventas trimestrales", "la migración a Kubernetes", "el lanzamiento del producto",
+    "la auditoría de seguridad", "el presupuesto de marketing", "la contratación de ingenieros",
+    "la expansión a México", "el nuevo CRM", "la política de devoluciones", "los costes de AWS",
+]
+# Temas que nunca se cachean: las consultas sobre ellos no tienen respuesta válida en caché
+UNSEEN_TOPICS = [
+    "la renovación de licencias", "el plan de formación", "la huella de carbono",
+    "la integración con SAP", "el programa de fidelización",
+]
+
+
+# (prompt cacheado, variantes que cambian el significado) por tipo de negativo cercano
+NEAR_MISSES = {
+    "número": [
+        ("Resume el siguiente informe de {x} en tres puntos",
+         ["Resume el siguiente informe de {x} en cinco puntos", "Resume el siguiente informe de {x} en 10 puntos"]),
+        ("Aprueba la factura 1234 de {x}", ["Aprueba la factura 1235 de {x}", "Aprueba la factura 4321 de {x}"]),
+    ],
+    "fecha": [
+        ("Analiza las ventas de 2023 de {x}", ["Analiza las ventas de 2024 de {x}"]),
+        ("Prepara el cierre de marzo de {x}", ["Prepara el cierre de abril de {x}"]),
+        ("Agenda la revisión de {x} para el 15/03", ["Agenda la revisión de {x} para el 16/03"]),
+    ],
+    "negación": [
+        ("Aprueba la factura 1234 de {x}", ["No apruebes la factura 1234 de {x}"]),
+        ("Incluye los costes de {x} en el informe", ["No incluyas los costes de {x} en el informe",
+                                                      "Nunca incluyas los costes de {x} en el informe"]),
+    ],
+    "entidad": [
+        ("Escribe un email a Acme sobre {x}", ["Escribe un email a Globex sobre {x}"]),
+        ("Compara {x} entre España y Chile", ["Compara {x} entre España y Perú"]),
+    ],
+}
+
+
+def synthetic_pairs(seed: int = 7) -> List[Tuple[str, str, bool]]:
+    """Positivos: paráfrasis de un prompt cacheado. Negativos: la misma plantilla
+    con un tema no cacheado, y los negativos cercanos de ``NEAR_MISSES``."""
+    rng = random.Random(seed)
+    pairs = []
+    for template, paraphrases in TEMPLATES:
+        for topic in TOPICS:
+            cached = template.format(x=topic)
+            for paraphrase in paraphrases:
+                pairs.append((cached, paraphrase.format(x=topic), True))
+            pairs.append((cached, rng.choice(paraphrases).format(x=rng.choice(UNSEEN_TOPICS)), False))
+    for variants in NEAR_MISSES.values():
+        for template, queries in variants:
+            for topic in TOPICS:
+                pairs.extend((template.format(x=topic), query.format(x=topic), False) for query in queries)
+    return pairs
+
+
+def load_pairs(path: str) -> List[Tuple[str, str, bool]]:
+    with open(path, encoding="utf-8") as handle:
+        return [
+            (row["cached"], row["query"], bool(row["equivalent"]))
+            for row in map(json.loads, handle) if row
+        ]
+
+
+def evaluate(pairs: List[Tuple[str, str, bool]], threshold: float, guards: bool = True) -> dict:
+    """Todos los prompts cacheados comparten índice (compiten como distractores).
+    Un hit es correcto si el prompt devuelto está marcado como equivalente a la
+    consulta; una consulta sin equivalentes nunca debería acertar."""
+    cache = SemanticCache(threshold=threshold, max_entries=len(pairs) + 1, guards=guards)
+    for prompt in sorted({cached for cached, _, _ in pairs}):
+        cache.store("eval", prompt, prompt)
+
+    acceptable: Dict[str, Set[str]] = {}
+    for cached, query, equivalent in pairs:
+        acceptable.setdefault(query, set())
+        if equivalent:
+            acceptable[query].add(cached)
+
+    true_hits = false_hits = lsh_misses = 0
+    positives = sum(1 for prompts in acceptable.values() if prompts)
+    lookup_time = 0.0
+    for query, prompts in acceptable.items():
+        start = time.perf_counter()
+        hit = cache.lookup("eval", query)
+        lookup_time += time.perf_counter() - start
+        if hit and hit[0] in prompts:
+            true_hits += 1
+        elif hit:
+            false_hits += 1
+        elif prompts:
+            # ¿La búsqueda exhaustiva lo habría encontrado?
+            vector = cache.vectorizer.transform(query)
+            if any(float(vector @ cache.vectorizer.transform(prompt)) >= threshold
+                   and (not guards or guard_tokens(prompt) == guard_tokens(query)) for prompt in prompts):
+                lsh_misses += 1
+
+    hits = true_hits + false_hits
+    return {
+        "threshold": threshold,
+        "precision": true_hits / hits if hits else 1.0,
+        "recall": true_hits / positives if positives else 0.0,
+        "hit_rate": hits / len(acceptable),
+        "lsh_misses": lsh_misses,
+        "lookup_us": lookup_time / len(acceptable) * 1e6,
+    }
+
+
+def similarity_distribution(pairs: List[Tuple[str, str, bool]]):
+    vectorizer = SemanticCache().vectorizer
+    for label, wanted in (("equivalentes", True), ("distintos", False)):
+        scores = np.array([
+            float(vectorizer.transform(cached) @ vectorizer.transform(query))
+            for cached, query, equivalent in pairs if equivalent is wanted
+        ])
+        if len(scores):
+            print(f"similitud {label:<13} p5={np.percentile(scores, 5):.3f} "
+                  f"p50={np.percentile(scores, 50):.3f} p95={np.percentile(scores, 95):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", help="JSONL con cached/query/equivalent")
+    parser.add_argument("--thresholds", default="0.8,0.85,0.9,0.92,0.95")
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.dataset) if args.dataset else synthetic_pairs()
+    print(f"{len(pairs)} pares ({sum(equivalent for _, _, equivalent in pairs)} equivalentes)")
+    similarity_distribution(pairs)
+    print()
+    print(f"{'umbral':>7}{'precisión':>11}{'recall':>9}{'hit rate':>10}{'fallos LSH':>12}{'búsqueda µs':>13}"
+          f"{'precisión sin guarda':>22}")
+    for threshold in (float(value) for value in args.thresholds.split(",")):
+        row = evaluate(pairs, threshold)
+        unguarded = evaluate(pairs, threshold, guards=False)
+        print(f"{row['threshold']:>7.2f}{row['precision']:>11.3f}{row['recall']:>9.3f}"
+              f"{row['hit_rate']:>10.3f}{row['lsh_misses']:>12}{row['lookup_us']:>13.1f}"
+              f"{unguarded['precision']:>22.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Microbenchmark: coste por petición de la validación de parámetros
+
+Mide, para el esquema de cada herramienta incluida, cuánto tarda el
+validador compilado en aceptar una petición válida (aplicando defaults) y
+en rechazar una inválida. Si ``jsonschema`` está instalado se incluye como
+referencia un validador interpretado sobre el mismo esquema.
+
+Uso (desde mcp_server/):
+    python -m benchmarks.validation_benchmark [--iterations 20000]
+"""
+
+import argparse
+import timeit
+from typing import Any, Dict, Tuple
+
+from tools import BUILTIN_TOOLS, ToolRegistry
+from tools.schema import ParameterValidationError, compile_schema
+
+# Ejemplos representativos por tipo de propiedad
+SAMPLE_VALUES = {
+    "string": "valor",
+    "integer": 5,
+    "number": 0.5,
+    "boolean": True,
+    "array": [],
+    "object": {},
+}
+FORMAT_SAMPLES = {"date": "2025-01-15", "email": "equipo@empresa.com", "date-time": "2025-01-15T10:00:00"}
+
+
+def sample_payloads(schema: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Construir una petición válida (solo requeridos) y otra inválida"""
+    valid, invalid = {}, {}
+    for name, prop in schema.get("properties", {}).items():
+        if "enum" in prop:
+            value = prop["enum"][0]
+        elif "format" in prop:
+            value = FORMAT_SAMPLES.get(prop["format"], "valor")
+        else:
+            value = SAMPLE_VALUES.get(prop.get("type"), "valor")
+        if name in schema.get("required", []):
+            valid[name] = value
+        # Tipo equivocado en todas las propiedades para forzar errores
+        invalid[name] = [] if prop.get("type") != "array" else "no-es-lista"
+    return valid, invalid
+
+
+def bench(func, payload, iterations: int) -> float:
+    """Microsegundos por llamada"""
+    def call():
+        try:
+            func(payload)
+        except Exception:
+            pass
+    return timeit.timeit(call, number=iterations) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    try:
+        import jsonschema
+    except ImportError:
+        jsonschema = None
+
+    definitions = ToolRegistry().load(BUILTIN_TOOLS)
+    header = f"{'herramienta':<22}{'válida µs':>11}{'inválida µs':>13}"
+    if jsonschema:
+        header += f"{'jsonschema µs':>15}"
+    print(header)
+    print("-" * len(header))
+
+    totals = []
+    for tool_id, definition in sorted(definitions.items()):
+        validator = compile_schema(tool_id, definition.parameters_schema)
+        valid, invalid = sample_payloads(definition.parameters_schema)
+        validator(valid)
+        try:
+            validator(invalid)
+            raise SystemExit(f"{tool_id}: la petición inválida no fue rechazada")
+        except ParameterValidationError:
+            pass
+
+        row = [bench(validator, valid, args.iterations), bench(validator, invalid, args.iterations)]
+        line = f"{tool_id:<22}{row[0]:>11.2f}{row[1]:>13.2f}"
+        if jsonschema:
+            reference = jsonschema.Draft7Validator(definition.parameters_schema)
+            row.append(bench(reference.validate, valid, args.iterations))
+            line += f"{row[2]:>15.2f}"
+        totals.append(row)
+        print(line)
+
+    averages = [sum(column) / len(column) for column in zip(*totals)]
+    print("-" * len(header))
+    print(f"{'media':<22}" + "".join(
+        f"{value:>{width}.2f}" for value, width in zip(averages, (11, 13, 15))
+    ))
+
+
+if __name__ == "__main__":
+    main()
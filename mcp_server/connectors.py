@@ -0,0 +1,271 @@
+"""
+Conectores a proveedores externos del MCP Server
+
+Cada proveedor tiene un conector con una sesión HTTP de larga duración
+(pool de conexiones keep-alive) y un gobernador de tasa token bucket. El
+estado del bucket vive en Redis y se actualiza con un script Lua atómico, de
+modo que todas las réplicas comparten el mismo límite. Cuando no quedan
+tokens la llamada reserva uno futuro (el bucket queda en deuda) y espera su
+turno, siempre que la espera no supere ``max_wait``; solo entonces falla, en
+lugar de provocar un 429 del proveedor.
+
+Las herramientas simulan sus llamadas salvo que el proveedor tenga una URL
+configurada explícitamente (``MCP_PROVIDER_<NOMBRE>_URL``); en ese caso las
+herramientas que lo soportan llaman al proveedor con ``Connector.request``.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# Tras un fallo de Redis el gobernador usa el bucket local y reintenta Redis
+# con backoff exponencial entre estos dos límites (segundos)
+GOVERNOR_REDIS_RETRY_BASE = float(os.getenv("MCP_GOVERNOR_REDIS_RETRY_BASE", "1"))
+GOVERNOR_REDIS_RETRY_MAX = float(os.getenv("MCP_GOVERNOR_REDIS_RETRY_MAX", "30"))
+
+# Devuelve {concedido (1/0), segundos de espera}; la espera va como texto porque
+# Lua truncaría a entero un número devuelto directamente. El reloj es el de
+# Redis para que todas las réplicas vean el mismo tiempo.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = math.max(0, (requested - tokens) / rate)
+if wait > max_wait then
+    return {0, tostring(wait)}
+end
+tokens = tokens - requested
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+return {1, tostring(wait)}
+"""
+
+
+class RateLimitExceeded(Exception):
+    """El proveedor no tendrá capacidad dentro del tiempo máximo de espera"""
+
+    def __init__(self, provider: str, retry_after: int):
+        super().__init__(f"Límite de tasa del proveedor {provider} alcanzado, reintentar en {retry_after}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+@dataclass
+class ProviderConfig:
+    """Límites de un proveedor; todos sobrescribibles con MCP_PROVIDER_<NOMBRE>_<CAMPO>"""
+    name: str
+    base_url: str
+    rate: float  # peticiones por segundo sostenidas
+    burst: int  # ráfaga máxima
+    max_connections: int = 20
+    max_wait: float = 5.0  # segundos de espera máxima por un token
+    token_env: Optional[str] = None  # variable con el token de autenticación
+    headers: Dict[str, str] = field(default_factory=dict)
+    live: bool = False  # URL configurada: las herramientas llaman al proveedor en lugar de simular
+
+    @classmethod
+    def from_env(cls, config: "ProviderConfig") -> "ProviderConfig":
+        prefix = f"MCP_PROVIDER_{config.name.upper()}_"
+        return cls(
+            name=config.name,
+            base_url=os.getenv(prefix + "URL", config.base_url),
+            rate=float(os.getenv(prefix + "RATE", config.rate)),
+            burst=int(os.getenv(prefix + "BURST", config.burst)),
+            max_connections=int(os.getenv(prefix + "MAX_CONNECTIONS", config.max_connections)),
+            max_wait=float(os.getenv(prefix + "MAX_WAIT", config.max_wait)),
+            token_env=config.token_env,
+            headers=dict(config.headers),
+            live=os.getenv(prefix + "URL") is not None,
+        )
+
+
+# Límites publicados por cada proveedor, expresados en peticiones/segundo
+PROVIDERS: Dict[str, ProviderConfig] = {
+    config.name: config for config in (
+        ProviderConfig("openai", "https://api.openai.com/v1", rate=50, burst=100, token_env="OPENAI_API_KEY"),
+        ProviderConfig("github", "https://api.github.com", rate=5000 / 3600, burst=50, token_env="GITHUB_TOKEN"),
+        ProviderConfig("slack", "https://slack.com/api", rate=1, burst=5, token_env="SLACK_BOT_TOKEN"),
+        ProviderConfig("serpapi", "https://serpapi.com", rate=5, burst=10, token_env="SERPAPI_API_KEY"),
+        ProviderConfig("newsapi", "https://newsapi.org/v2", rate=2, burst=10, token_env="NEWSAPI_API_KEY"),
+        ProviderConfig("google_maps", "https://maps.googleapis.com/maps/api", rate=50, burst=100,
+                       token_env="GOOGLE_MAPS_API_KEY"),
+        ProviderConfig("salesforce", "https://login.salesforce.com", rate=25, burst=50,
+                       token_env="SALESFORCE_ACCESS_TOKEN"),
+        ProviderConfig("financial", "https://www.alphavantage.co", rate=5 / 60, burst=5,
+                       token_env="ALPHA_VANTAGE_API_KEY"),
+        ProviderConfig("twitter", "https://api.twitter.com/2", rate=300 / 900, burst=10,
+                       token_env="TWITTER_BEARER_TOKEN"),
+        ProviderConfig("aws", "https://aws.amazon.com", rate=20, burst=40),
+    )
+}
+
+
+class TokenBucketGovernor:
+    """Token bucket compartido entre réplicas vía Redis
+
+    Si Redis falla, esa llamada se sirve con un bucket en proceso para no
+    bloquearla (el límite pasa a ser por réplica) y Redis se vuelve a probar
+    tras un backoff exponencial acotado por ``GOVERNOR_REDIS_RETRY_MAX``.
+    """
+
+    def __init__(self, provider: str, rate: float, burst: int, max_wait: float,
+                 redis: Optional[aioredis.Redis] = None):
+        self.provider = provider
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.key = f"mcp:ratelimit:{provider}"
+        self.script = redis.register_script(TOKEN_BUCKET_SCRIPT) if redis else None
+        self.local_tokens = float(burst)
+        self.local_ts = time.monotonic()
+        self.redis_failures = 0
+        self.redis_retry_at = 0.0
+        self.stats = {"granted": 0, "waited": 0, "rejected": 0, "wait_seconds": 0.0, "local_fallbacks": 0}
+
+    @property
+    def shared(self) -> bool:
+        """El límite se está aplicando entre réplicas (Redis disponible)"""
+        return self.script is not None and self.redis_failures == 0
+
+    def _reserve_local(self) -> Tuple[bool, float]:
+        now = time.monotonic()
+        self.local_tokens = min(self.burst, self.local_tokens + (now - self.local_ts) * self.rate)
+        self.local_ts = now
+        wait = max(0.0, (1 - self.local_tokens) / self.rate)
+        if wait > self.max_wait:
+            return False, wait
+        self.local_tokens -= 1
+        return True, wait
+
+    async def _reserve(self) -> Tuple[bool, float]:
+        if self.script is not None and time.monotonic() >= self.redis_retry_at:
+            try:
+                granted, wait = await self.script(keys=[self.key], args=[self.rate, self.burst, 1, self.max_wait])
+            except Exception as e:
+                self.redis_failures += 1
+                backoff = min(GOVERNOR_REDIS_RETRY_MAX, GOVERNOR_REDIS_RETRY_BASE * 2 ** (self.redis_failures - 1))
+                self.redis_retry_at = time.monotonic() + backoff
+                logger.error(f"Gobernador de {self.provider} sin Redis, usando bucket local "
+                             f"y reintentando en {backoff:g}s: {e}")
+            else:
+                if self.redis_failures:
+                    logger.info(f"Gobernador de {self.provider} vuelve a compartir el límite en Redis")
+                    self.redis_failures = 0
+                return bool(int(granted)), float(wait)
+        if self.script is not None:
+            self.stats["local_fallbacks"] += 1
+        return self._reserve_local()
+
+    async def acquire(self):
+        """Reservar un token y esperar su turno; RateLimitExceeded si la espera excede max_wait"""
+        granted, wait = await self._reserve()
+        if not granted:
+            self.stats["rejected"] += 1
+            raise RateLimitExceeded(self.provider, max(1, math.ceil(wait)))
+        self.stats["granted"] += 1
+        if wait > 0:
+            self.stats["waited"] += 1
+            self.stats["wait_seconds"] += wait
+            await asyncio.sleep(wait)
+
+
+class Connector:
+    """Cliente HTTP reutilizable de un proveedor con su gobernador de tasa"""
+
+    def __init__(self, config: ProviderConfig, redis: Optional[aioredis.Redis] = None):
+        self.config = config
+        self.governor = TokenBucketGovernor(config.name, config.rate, config.burst, config.max_wait, redis)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        headers = dict(self.config.headers)
+        token = os.getenv(self.config.token_env) if self.config.token_env else None
+        if token:
+            headers.setdefault("Authorization", f"Bearer {token}")
+        self.session = aiohttp.ClientSession(
+            base_url=self.config.base_url.rstrip("/") + "/",
+            headers=headers,
+            connector=aiohttp.TCPConnector(limit=self.config.max_connections, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=60),
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """Petición gobernada; un 429 del proveedor se reintenta tras su Retry-After"""
+        deadline = time.monotonic() + self.config.max_wait
+        while True:
+            await self.governor.acquire()
+            async with self.session.request(method, path.lstrip("/"), **kwargs) as response:
+                if response.status == 429:
+                    retry_after = float(response.headers.get("Retry-After", 1))
+                    if time.monotonic() + retry_after > deadline:
+                        raise RateLimitExceeded(self.config.name, max(1, math.ceil(retry_after)))
+                    await asyncio.sleep(retry_after)
+                    continue
+                response.raise_for_status()
+                return await response.json()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.config.base_url,
+            "rate": self.config.rate,
+            "burst": self.config.burst,
+            "live": self.config.live,
+            "shared": self.governor.shared,
+            **self.governor.stats,
+        }
+
+
+class ConnectorRegistry:
+    """Conectores de todos los proveedores, creados una vez al arrancar"""
+
+    def __init__(self):
+        self.connectors: Dict[str, Connector] = {}
+
+    async def start(self, redis: Optional[aioredis.Redis] = None):
+        for config in PROVIDERS.values():
+            connector = Connector(ProviderConfig.from_env(config), redis)
+            await connector.start()
+            self.connectors[config.name] = connector
+
+    async def close(self):
+        await asyncio.gather(*(connector.close() for connector in self.connectors.values()))
+
+    def get(self, provider: str) -> Connector:
+        return self.connectors[provider]
+
+    def live(self, provider: str) -> bool:
+        """El proveedor tiene URL configurada y las herramientas deben llamarlo de verdad"""
+        connector = self.connectors.get(provider)
+        return connector is not None and connector.config.live
+
+    async def request(self, provider: str, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        return await self.connectors[provider].request(method, path, **kwargs)
+
+    async def acquire(self, provider: Optional[str]):
+        """Consumir un token del proveedor antes de una llamada (si la herramienta tiene proveedor)"""
+        if provider and provider in self.connectors:
+            await self.connectors[provider].governor.acquire()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: connector.snapshot() for name, connector in self.connectors.items()}
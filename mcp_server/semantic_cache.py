@@ -0,0 +1,210 @@
+"""
+Caché semántica de prompts para el MCP Server
+
+Los prompts se convierten en vectores con un hashing vectorizer (palabras y
+n-gramas de caracteres, solo CPU, sin modelo que descargar) y se indexan en
+memoria con LSH de hiperplanos aleatorios. Una consulta solo compara por
+coseno contra los candidatos que comparten cubeta en alguna tabla, y devuelve
+la respuesta cacheada si la similitud supera el umbral configurado.
+
+La similitud coseno no distingue prompts que solo difieren en un número, una
+fecha o una negación ("ventas de 2023" frente a "ventas de 2024", "aprueba"
+frente a "no apruebes"). Por eso un candidato solo se acepta si además
+coinciden sus tokens críticos: números, meses, negaciones y nombres propios.
+"""
+
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+SENTENCE_START = re.compile(r"(?:^|[.!?¿¡:;\n])\s*$")
+
+# Números escritos con letra: "tres puntos" y "3 puntos" piden lo mismo
+NUMBER_WORDS = {
+    "cero": "0", "uno": "1", "una": "1", "dos": "2", "tres": "3", "cuatro": "4", "cinco": "5",
+    "seis": "6", "siete": "7", "ocho": "8", "nueve": "9", "diez": "10",
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+}
+MONTHS = {
+    "enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+    "septiembre", "setiembre", "octubre", "noviembre", "diciembre",
+    "january", "february", "march", "april", "may", "june", "july", "august",
+    "september", "october", "november", "december",
+}
+NEGATIONS = {
+    "no", "ni", "nunca", "jamás", "jamas", "tampoco", "sin", "ningún", "ninguno", "ninguna", "nada",
+    "not", "never", "without", "none", "nor", "don", "doesn", "didn", "isn", "aren", "won", "shouldn",
+}
+
+
+def guard_tokens(text: str) -> frozenset:
+    """Tokens que deben coincidir exactamente para reutilizar una respuesta
+
+    Números (normalizados a dígitos), meses, negaciones y palabras con
+    mayúscula que no abren frase (nombres propios, siglas). Todas las
+    negaciones cuentan como el mismo token: "no" y "nunca" son equivalentes.
+    """
+    tokens = set()
+    for match in TOKEN_PATTERN.finditer(text):
+        word = match.group()
+        lower = word.lower()
+        if word.isdigit():
+            tokens.add(str(int(word)))
+        elif lower in NUMBER_WORDS:
+            tokens.add(NUMBER_WORDS[lower])
+        elif lower in MONTHS:
+            tokens.add(lower)
+        elif lower in NEGATIONS:
+            tokens.add("<neg>")
+        elif word[0].isupper() and not SENTENCE_START.search(text, 0, match.start()):
+            tokens.add(lower)
+    return frozenset(tokens)
+
+
+class HashingVectorizer:
+    """Vectoriza texto en ``dimensions`` componentes con el truco del hashing"""
+
+    def __init__(self, dimensions: int = 2048, ngram: int = 3):
+        self.dimensions = dimensions
+        self.ngram = ngram
+
+    def features(self, text: str) -> List[str]:
+        words = TOKEN_PATTERN.findall(text.lower())
+        features = [f"w:{word}" for word in words]
+        # Bigramas de palabras: distinguen "no aprobar" de "aprobar"
+        features.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+        # N-gramas de caracteres: toleran variaciones morfológicas y erratas
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(f"c:{padded[i:i + self.ngram]}" for i in range(len(padded) - self.ngram + 1))
+        return features
+
+    def transform(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in self.features(text):
+            digest = zlib.crc32(feature.encode())
+            # El bit alto decide el signo para que las colisiones tiendan a cancelarse
+            vector[digest % self.dimensions] += 1.0 if digest & 0x80000000 else -1.0
+        # Frecuencia sublineal: repetir una palabra no domina el vector
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class LSHIndex:
+    """Índice ANN por coseno: ``tables`` tablas de ``bits`` hiperplanos cada una"""
+
+    def __init__(self, dimensions: int, tables: int = 16, bits: int = 10, seed: int = 42):
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((tables, bits, dimensions)).astype(np.float32)
+        self.weights = 1 << np.arange(bits, dtype=np.int64)
+        self.buckets: List[Dict[int, set]] = [{} for _ in range(tables)]
+
+    def signatures(self, vector: np.ndarray) -> List[int]:
+        bits = (self.planes @ vector) > 0
+        return [int(code) for code in bits.astype(np.int64) @ self.weights]
+
+    def add(self, entry_id: int, signatures: List[int]):
+        for table, signature in zip(self.buckets, signatures):
+            table.setdefault(signature, set()).add(entry_id)
+
+    def remove(self, entry_id: int, signatures: List[int]):
+        for table, signature in zip(self.buckets, signatures):
+            bucket = table.get(signature)
+            if bucket:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[signature]
+
+    def candidates(self, signatures: List[int]) -> set:
+        found = set()
+        for table, signature in zip(self.buckets, signatures):
+            found |= table.get(signature, set())
+        return found
+
+
+class SemanticCache:
+    """Respuestas cacheadas por similitud de prompt, separadas por espacio de nombres
+
+    El espacio de nombres (equipo, herramienta, modelo, parámetros no textuales)
+    evita reutilizar respuestas entre contextos distintos. Capacidad acotada con
+    expulsión LRU y expiración por TTL. ``guards=False`` desactiva la comprobación
+    de tokens críticos (solo para medir su efecto en la evaluación).
+    """
+
+    def __init__(self, threshold: float = 0.85, ttl: float = 3600, max_entries: int = 5000,
+                 dimensions: int = 2048, tables: int = 16, bits: int = 10, guards: bool = True):
+        self.threshold = threshold
+        self.guards = guards
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.vectorizer = HashingVectorizer(dimensions)
+        self.index = LSHIndex(dimensions, tables, bits)
+        # entry_id -> (namespace, vector, firmas, datos, expira, prompt, tokens críticos)
+        self.entries: "OrderedDict[int, Tuple[Hashable, np.ndarray, List[int], Any, float, str, frozenset]]" = OrderedDict()
+        self.next_id = 0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "guard_rejections": 0}
+
+    def _drop(self, entry_id: int):
+        entry = self.entries.pop(entry_id, None)
+        if entry:
+            self.index.remove(entry_id, entry[2])
+
+    def lookup(self, namespace: Hashable, prompt: str) -> Optional[Tuple[Any, float, str]]:
+        """Devuelve (datos, similitud, prompt cacheado) del vecino más cercano sobre el umbral
+        cuyos tokens críticos coinciden con los de la consulta"""
+        vector = self.vectorizer.transform(prompt)
+        guards = guard_tokens(prompt)
+        now = time.time()
+        best: Optional[Tuple[int, float]] = None
+        for entry_id in self.index.candidates(self.index.signatures(vector)):
+            entry = self.entries.get(entry_id)
+            if entry is None or entry[0] != namespace:
+                continue
+            if entry[4] < now:
+                self._drop(entry_id)
+                continue
+            similarity = float(vector @ entry[1])
+            if similarity < self.threshold:
+                continue
+            if self.guards and entry[6] != guards:
+                self.stats["guard_rejections"] += 1
+            elif best is None or similarity > best[1]:
+                best = (entry_id, similarity)
+
+        if best is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self.entries.move_to_end(best[0])
+        entry = self.entries[best[0]]
+        return entry[3], best[1], entry[5]
+
+    def store(self, namespace: Hashable, prompt: str, data: Any):
+        vector = self.vectorizer.transform(prompt)
+        signatures = self.index.signatures(vector)
+        entry_id = self.next_id
+        self.next_id += 1
+        self.entries[entry_id] = (
+            namespace, vector, signatures, data, time.time() + self.ttl, prompt, guard_tokens(prompt)
+        )
+        self.index.add(entry_id, signatures)
+        self.stats["stores"] += 1
+        while len(self.entries) > self.max_entries:
+            self._drop(next(iter(self.entries)))
+            self.stats["evictions"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self.entries),
+            "threshold": self.threshold,
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0
+        }
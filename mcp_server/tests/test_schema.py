@@ -0,0 +1,134 @@
+"""
+Tests del compilador de esquemas de parámetros de herramientas
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tools.schema import ParameterValidationError, compile_schema  # noqa: E402
+
+SEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string", "minLength": 1, "maxLength": 50},
+        "num_results": {"type": "integer", "minimum": 1, "maximum": 20, "default": 10},
+        "language": {"type": "string", "enum": ["es", "en"], "default": "es"},
+        "filters": {"type": "object", "default": {}},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "since": {"type": "string", "format": "date"},
+        "notify": {"type": "string", "format": "email"},
+    },
+    "required": ["query"],
+}
+
+
+def errors_of(validate, parameters):
+    with pytest.raises(ParameterValidationError) as excinfo:
+        validate(parameters)
+    return excinfo.value.errors
+
+
+def test_defaults_are_applied_to_a_copy():
+    validate = compile_schema("web_search", SEARCH_SCHEMA)
+    parameters = {"query": "mcp"}
+
+    result = validate(parameters)
+
+    assert result == {"query": "mcp", "num_results": 10, "language": "es", "filters": {}}
+    assert parameters == {"query": "mcp"}
+
+
+def test_explicit_values_win_over_defaults():
+    validate = compile_schema("web_search", SEARCH_SCHEMA)
+    result = validate({"query": "mcp", "num_results": 3, "language": "en"})
+    assert (result["num_results"], result["language"]) == (3, "en")
+
+
+def test_mutable_defaults_are_not_shared_between_requests():
+    validate = compile_schema("web_search", SEARCH_SCHEMA)
+    first = validate({"query": "a"})
+    first["filters"]["site"] = "example.com"
+    assert validate({"query": "b"})["filters"] == {}
+
+
+def test_required_field_with_default_is_optional():
+    schema = {"type": "object", "properties": {"mode": {"type": "string", "default": "fast"}}, "required": ["mode"]}
+    assert compile_schema("tool", schema)({}) == {"mode": "fast"}
+
+
+def test_missing_required_field():
+    errors = errors_of(compile_schema("web_search", SEARCH_SCHEMA), {})
+    assert errors == [{"loc": ["parameters", "query"], "msg": "campo requerido", "type": "value_error.missing"}]
+
+
+@pytest.mark.parametrize("parameters, loc, error_type", [
+    ({"query": 5}, ["parameters", "query"], "type_error.string"),
+    ({"query": ""}, ["parameters", "query"], "value_error.minlength"),
+    ({"query": "x" * 51}, ["parameters", "query"], "value_error.maxlength"),
+    ({"query": "a", "num_results": 0}, ["parameters", "num_results"], "value_error.minimum"),
+    ({"query": "a", "num_results": 21}, ["parameters", "num_results"], "value_error.maximum"),
+    ({"query": "a", "num_results": True}, ["parameters", "num_results"], "type_error.integer"),
+    ({"query": "a", "language": "fr"}, ["parameters", "language"], "value_error.enum"),
+    ({"query": "a", "since": "2024-13-01"}, ["parameters", "since"], "value_error.format.date"),
+    ({"query": "a", "notify": "not-an-email"}, ["parameters", "notify"], "value_error.format.email"),
+    ({"query": "a", "tags": ["ok", 3]}, ["parameters", "tags", 1], "type_error.string"),
+])
+def test_invalid_parameters_report_their_path(parameters, loc, error_type):
+    errors = errors_of(compile_schema("web_search", SEARCH_SCHEMA), parameters)
+    assert [(error["loc"], error["type"]) for error in errors] == [(loc, error_type)]
+
+
+def test_all_errors_are_reported_together():
+    errors = errors_of(compile_schema("web_search", SEARCH_SCHEMA), {"num_results": "many", "language": "fr"})
+    assert {tuple(error["loc"]) for error in errors} == {
+        ("parameters", "query"), ("parameters", "num_results"), ("parameters", "language")
+    }
+
+
+def test_wrong_type_stops_further_checks_on_that_node():
+    schema = {"type": "object", "properties": {"n": {"type": "integer", "minimum": 1, "enum": [1, 2]}}}
+    errors = errors_of(compile_schema("tool", schema), {"n": "x"})
+    assert [error["type"] for error in errors] == ["type_error.integer"]
+
+
+def test_additional_properties_false_rejects_unknown_fields():
+    schema = {"type": "object", "properties": {"a": {"type": "string"}}, "additionalProperties": False}
+    errors = errors_of(compile_schema("tool", schema), {"a": "x", "b": 1})
+    assert errors == [{"loc": ["parameters", "b"], "msg": "campo no permitido", "type": "value_error.extra"}]
+
+
+def test_nested_objects_apply_defaults_and_report_nested_paths():
+    schema = {
+        "type": "object",
+        "properties": {
+            "options": {
+                "type": "object",
+                "properties": {"depth": {"type": "integer", "default": 2}, "mode": {"type": "string"}},
+                "required": ["mode"],
+            }
+        },
+    }
+    validate = compile_schema("tool", schema)
+    assert validate({"options": {"mode": "x"}}) == {"options": {"mode": "x", "depth": 2}}
+    assert errors_of(validate, {"options": {}})[0]["loc"] == ["parameters", "options", "mode"]
+
+
+def test_error_message_names_the_tool_and_fields():
+    with pytest.raises(ParameterValidationError) as excinfo:
+        compile_schema("web_search", SEARCH_SCHEMA)({"num_results": 0})
+    assert excinfo.value.tool_id == "web_search"
+    assert "web_search" in str(excinfo.value)
+    assert "num_results" in str(excinfo.value)
+
+
+def test_unsupported_type_fails_at_compile_time():
+    with pytest.raises(ValueError):
+        compile_schema("tool", {"type": "object", "properties": {"a": {"type": "decimal"}}})
+
+
+def test_empty_schema_accepts_any_object():
+    assert compile_schema("tool", {})({"anything": 1}) == {"anything": 1}
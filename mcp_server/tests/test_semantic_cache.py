@@ -0,0 +1,44 @@
+"""
+Tests de la caché semántica de prompts
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from semantic_cache import SemanticCache, guard_tokens  # noqa: E402
+
+
+@pytest.mark.parametrize("cached, query", [
+    ("Resume las ventas de 2023 por región", "Resume las ventas de 2024 por región"),
+    ("Aprueba la factura 1234", "No apruebes la factura 1234"),
+    ("Prepara el cierre de marzo", "Prepara el cierre de abril"),
+    ("Escribe un email a Acme sobre la renovación", "Escribe un email a Globex sobre la renovación"),
+])
+def test_near_misses_are_not_served_from_cache(cached, query):
+    cache = SemanticCache(threshold=0.5)
+    cache.store("ns", cached, "respuesta")
+    assert cache.lookup("ns", query) is None
+
+
+def test_paraphrase_with_the_same_critical_tokens_hits():
+    cache = SemanticCache()
+    cache.store("ns", "Resume el siguiente informe de ventas en tres puntos", "respuesta")
+    hit = cache.lookup("ns", "Resume el siguiente informe de ventas en 3 puntos")
+    assert hit is not None and hit[0] == "respuesta"
+
+
+def test_guard_tokens_normalize_numbers_and_negations():
+    assert guard_tokens("Genera cinco ideas") == guard_tokens("Genera 5 ideas") == frozenset({"5"})
+    assert guard_tokens("No incluyas costes") == guard_tokens("Nunca incluyas costes") == frozenset({"<neg>"})
+    # La mayúscula que abre frase no es un nombre propio
+    assert guard_tokens("Resume el informe. Luego envíalo a Acme") == frozenset({"acme"})
+
+
+def test_namespaces_are_isolated():
+    cache = SemanticCache()
+    cache.store("marketing", "Explica los riesgos principales del nuevo CRM", "respuesta")
+    assert cache.lookup("research", "Explica los riesgos principales del nuevo CRM") is None
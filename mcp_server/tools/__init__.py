@@ -0,0 +1,130 @@
+"""
+Registro de herramientas MCP
+
+Cada herramienta vive en su propio módulo y expone un ``TOOL`` de tipo
+``ToolDefinition`` con su esquema, handler, timeout y bulkhead (concurrencia y cola).
+Los módulos solo se importan cuando la herramienta está habilitada, y se
+pueden añadir herramientas externas publicando un entry point en el grupo
+``mcp_server.tools`` (nombre = tool_id, valor = ``paquete.modulo:TOOL``).
+"""
+
+import importlib
+import logging
+from dataclasses import dataclass, field
+from importlib.metadata import entry_points
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "mcp_server.tools"
+
+# Herramientas incluidas: tool_id -> módulo dentro de este paquete
+BUILTIN_TOOLS = {
+    "web_search": "web_search",
+    "news_search": "news_search",
+    "openai_chat": "openai_chat",
+    "openai_image": "openai_image",
+    "github_api": "github_api",
+    "git_operations": "git_operations",
+    "send_email": "send_email",
+    "send_slack": "send_slack",
+    "salesforce_api": "salesforce_api",
+    "google_maps": "google_maps",
+    "financial_data": "financial_data",
+    "social_media_search": "social_media_search",
+    "aws_cli": "aws_cli",
+    "docker_operations": "docker_operations",
+}
+
+ToolHandler = Callable[[Dict[str, Any], Any], Awaitable[Dict[str, Any]]]
+# Emite fragmentos {"delta": str} y, opcionalmente, un último {"result": {...}} con el resultado completo
+ToolStreamHandler = Callable[[Dict[str, Any], Any], AsyncIterator[Dict[str, Any]]]
+
+
+@dataclass
+class ToolDefinition:
+    """Declaración de una herramienta: metadatos del catálogo más su ejecución"""
+    tool_id: str
+    name: str
+    description: str
+    category: str
+    team_access: List[str]
+    parameters_schema: Dict[str, Any]
+    handler: ToolHandler
+    stream_handler: Optional[ToolStreamHandler] = None
+    timeout: float = 30.0
+    max_concurrency: int = 10
+    # Bulkhead: llamadas en espera admitidas y cuánto pueden esperar un hueco
+    max_queue: int = 50
+    queue_timeout: float = 2.0
+    # Caché de resultados: solo para herramientas de solo lectura (None = sin caché)
+    cache_ttl: Optional[float] = None
+    cache_stale_ttl: float = 0.0
+    # Parámetro de texto libre para la caché semántica (opt-in por equipo)
+    semantic_cache_field: Optional[str] = None
+    rate_limit: int = 100
+    requires_auth: bool = False
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def catalog_entry(self) -> Dict[str, Any]:
+        """Campos publicados en el catálogo (modelo MCPTool)"""
+        return {
+            "tool_id": self.tool_id,
+            "name": self.name,
+            "description": self.description,
+            "category": self.category,
+            "team_access": self.team_access,
+            "parameters_schema": self.parameters_schema,
+            "rate_limit": self.rate_limit,
+            "requires_auth": self.requires_auth,
+            "streaming": self.stream_handler is not None,
+            "timeout": self.timeout,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "cache_ttl": self.cache_ttl,
+            "cache_stale_ttl": self.cache_stale_ttl,
+            "semantic_cache_field": self.semantic_cache_field,
+            **self.extra,
+        }
+
+
+class ToolRegistry:
+    """Descubre y carga bajo demanda los módulos de herramientas"""
+
+    def __init__(self):
+        self.definitions: Dict[str, ToolDefinition] = {}
+
+    def discover(self) -> Dict[str, Callable[[], ToolDefinition]]:
+        """Devuelve un cargador perezoso por tool_id sin importar ningún módulo"""
+        loaders: Dict[str, Callable[[], ToolDefinition]] = {
+            tool_id: (lambda module=module: importlib.import_module(f".{module}", __name__).TOOL)
+            for tool_id, module in BUILTIN_TOOLS.items()
+        }
+        # Las herramientas de terceros pueden sobrescribir a las incluidas
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            loaders[entry_point.name] = entry_point.load
+        return loaders
+
+    def load(self, enabled: Optional[Iterable[str]] = None) -> Dict[str, ToolDefinition]:
+        """Importa solo las herramientas habilitadas (todas si ``enabled`` está vacío)"""
+        enabled_ids = set(enabled or ())
+        for tool_id, loader in self.discover().items():
+            if enabled_ids and tool_id not in enabled_ids:
+                continue
+            try:
+                definition = loader()
+            except Exception as e:
+                logger.error(f"❌ Error cargando herramienta {tool_id}: {e}")
+                continue
+            if definition.tool_id != tool_id:
+                logger.warning(f"Herramienta registrada como {tool_id} declara tool_id {definition.tool_id}")
+            self.definitions[definition.tool_id] = definition
+
+        missing = enabled_ids - set(self.definitions)
+        if missing:
+            logger.warning(f"Herramientas habilitadas no encontradas: {', '.join(sorted(missing))}")
+        return self.definitions
+
+    def get(self, tool_id: str) -> Optional[ToolDefinition]:
+        return self.definitions.get(tool_id)
@@ -0,0 +1,42 @@
+"""
+Herramienta MCP: AWS CLI
+"""
+
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Comandos AWS simulados"""
+    await server.connectors.acquire("aws")
+    await server.simulate_upstream("aws_cli", 1.2)
+    return {
+        "service": params.get("service"),
+        "command": params.get("command"),
+        "status": "success",
+        "output": f"Resultado simulado de AWS {params.get('service')} {params.get('command')}"
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="aws_cli",
+    name="AWS CLI",
+    description="Comandos AWS para infraestructura",
+    category="cloud",
+    team_access=["cloud_services", "security", "devops"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "service": {"type": "string"},
+            "command": {"type": "string"},
+            "parameters": {"type": "object"}
+        },
+        "required": ["service", "command"]
+    },
+    handler=run,
+    timeout=120,
+    max_concurrency=5,
+    max_queue=10,
+    queue_timeout=10
+)
@@ -0,0 +1,41 @@
+"""
+Herramienta MCP: Operaciones Docker
+"""
+
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Operaciones Docker simuladas"""
+    await server.simulate_upstream("docker_operations", 1.0)
+    return {
+        "operation": params.get("operation"),
+        "container": params.get("container"),
+        "status": "success",
+        "output": f"Operación {params.get('operation')} en contenedor {params.get('container')} completada"
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="docker_operations",
+    name="Operaciones Docker",
+    description="Gestión de contenedores Docker",
+    category="infrastructure",
+    team_access=["cloud_services", "devops", "security"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "operation": {"type": "string", "enum": ["start", "stop", "restart", "logs", "inspect"]},
+            "container": {"type": "string"},
+            "options": {"type": "object"}
+        },
+        "required": ["operation", "container"]
+    },
+    handler=run,
+    timeout=60,
+    max_concurrency=10,
+    max_queue=20,
+    queue_timeout=10
+)
@@ -0,0 +1,51 @@
+"""
+Herramienta MCP: Datos Financieros
+"""
+
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Datos financieros simulados"""
+    await server.connectors.acquire("financial")
+    await server.simulate_upstream("financial_data", 0.9)
+    symbol = params.get("symbol", "AAPL")
+    return {
+        "symbol": symbol,
+        "data_points": [
+            {
+                "date": f"2024-01-{str(i).zfill(2)}",
+                "price": round(150.0 + i * 2.5, 2),
+                "volume": 1000000 + i * 10000
+            }
+            for i in range(1, 11)
+        ],
+        "current_price": 175.50,
+        "change": "+2.5"
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="financial_data",
+    name="Datos Financieros",
+    description="Obtener datos de acciones y mercados",
+    category="finance",
+    team_access=["finance", "strategy", "risk_management"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "symbol": {"type": "string"},
+            "start_date": {"type": "string", "format": "date"},
+            "end_date": {"type": "string", "format": "date"},
+            "interval": {"type": "string", "default": "1d"}
+        },
+        "required": ["symbol"]
+    },
+    handler=run,
+    timeout=20,
+    max_concurrency=30,
+    cache_ttl=60,
+    cache_stale_ttl=240
+)
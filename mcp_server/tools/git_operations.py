@@ -0,0 +1,42 @@
+"""
+Herramienta MCP: Operaciones Git
+"""
+
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Operaciones Git simuladas"""
+    await server.simulate_upstream("git_operations", 1.5)
+    return {
+        "operation": params.get("operation"),
+        "repo_url": params.get("repo_url"),
+        "status": "success",
+        "message": f"Operación {params.get('operation')} completada"
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="git_operations",
+    name="Operaciones Git",
+    description="Clonar, hacer commit, push de repositorios",
+    category="development",
+    team_access=["code_generation", "testing", "cloud_services"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "operation": {"type": "string", "enum": ["clone", "commit", "push", "pull"]},
+            "repo_url": {"type": "string"},
+            "message": {"type": "string"},
+            "files": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["operation", "repo_url"]
+    },
+    handler=run,
+    timeout=120,
+    max_concurrency=5,
+    max_queue=10,
+    queue_timeout=10
+)
@@ -0,0 +1,44 @@
+"""
+Herramienta MCP: API GitHub
+"""
+
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """API GitHub simulada"""
+    await server.connectors.acquire("github")
+    await server.simulate_upstream("github_api", 0.8)
+    return {
+        "endpoint": params.get("endpoint"),
+        "method": params.get("method", "GET"),
+        "status_code": 200,
+        "data": {
+            "repository": "owner/repo",
+            "url": f"https://api.github.com{params.get('endpoint')}",
+            "data": {"mock": "response"}
+        }
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="github_api",
+    name="API GitHub",
+    description="Acceder a repositorios y datos de GitHub",
+    category="development",
+    team_access=["code_generation", "testing", "research"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "endpoint": {"type": "string"},
+            "method": {"type": "string", "default": "GET"},
+            "data": {"type": "object"}
+        },
+        "required": ["endpoint"]
+    },
+    handler=run,
+    timeout=30,
+    max_concurrency=20
+)
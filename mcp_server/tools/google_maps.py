@@ -0,0 +1,50 @@
+"""
+Herramienta MCP: Google Maps
+"""
+
+import uuid
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Google Maps simulado"""
+    await server.connectors.acquire("google_maps")
+    await server.simulate_upstream("google_maps", 0.6)
+    return {
+        "query": params.get("query"),
+        "location": params.get("location", "Madrid, España"),
+        "places": [
+            {
+                "name": f"Lugar {i+1}",
+                "address": f"Dirección {i+1}",
+                "rating": round(4.0 + i * 0.2, 1),
+                "place_id": f"place_{uuid.uuid4().hex[:8]}"
+            }
+            for i in range(5)
+        ]
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="google_maps",
+    name="Google Maps",
+    description="Búsquedas de lugares y direcciones",
+    category="location",
+    team_access=["sales", "supply_chain", "logistics", "business_development"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "query": {"type": "string"},
+            "location": {"type": "string"},
+            "radius": {"type": "integer", "default": 1000}
+        },
+        "required": ["query"]
+    },
+    handler=run,
+    timeout=15,
+    max_concurrency=50,
+    cache_ttl=86400,
+    cache_stale_ttl=86400
+)
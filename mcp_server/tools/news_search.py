@@ -0,0 +1,50 @@
+"""
+Herramienta MCP: Búsqueda de Noticias
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Búsqueda de noticias simulada"""
+    await server.connectors.acquire("newsapi")
+    await server.simulate_upstream("news_search", 0.3)
+    return {
+        "query": params.get("query"),
+        "articles": [
+            {
+                "title": f"Noticia {i+1} sobre {params.get('query')}",
+                "summary": f"Resumen de la noticia {i+1}...",
+                "source": f"Fuente {i+1}",
+                "date": datetime.now().isoformat()
+            }
+            for i in range(5)
+        ]
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="news_search",
+    name="Búsqueda de Noticias",
+    description="Buscar noticias recientes",
+    category="search",
+    team_access=["research", "marketing", "communications", "strategy"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "query": {"type": "string"},
+            "start_date": {"type": "string", "format": "date"},
+            "end_date": {"type": "string", "format": "date"},
+            "lang": {"type": "string", "default": "es"}
+        },
+        "required": ["query"]
+    },
+    handler=run,
+    timeout=15,
+    max_concurrency=50,
+    cache_ttl=300,
+    cache_stale_ttl=600
+)
@@ -0,0 +1,84 @@
+"""
+Herramienta MCP: Chat OpenAI
+"""
+
+from typing import Any, AsyncIterator, Dict
+
+from . import ToolDefinition
+
+
+async def complete(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Chat contra el proveedor configurado en ``MCP_PROVIDER_OPENAI_URL``"""
+    model = params.get("model", "gpt-3.5-turbo")
+    data = await server.connectors.request("openai", "POST", "chat/completions", json={
+        "model": model,
+        "messages": [{"role": "user", "content": params.get("message")}],
+        "temperature": params.get("temperature", 0.7),
+        "max_tokens": params.get("max_tokens", 1000)
+    })
+    choices = data.get("choices") or [{}]
+    return {
+        "model": data.get("model", model),
+        "response": choices[0].get("message", {}).get("content", data),
+        "usage": data.get("usage", {})
+    }
+
+
+async def stream(params: Dict[str, Any], server: Any) -> AsyncIterator[Dict[str, Any]]:
+    """Chat con OpenAI simulado, token a token"""
+    if server.connectors.live("openai"):
+        result = await complete(params, server)
+        yield {"delta": str(result["response"])}
+        yield {"result": result}
+        return
+    await server.connectors.acquire("openai")
+    await server.simulate_upstream("openai_chat", 0.3)  # Simular tiempo hasta el primer token
+    tokens = f"Respuesta simulada de OpenAI para: {params.get('message')}".split(" ")
+    for index, token in enumerate(tokens):
+        yield {"delta": token if index == 0 else f" {token}"}
+        await server.simulate_upstream("openai_chat.token", 0.05)
+    yield {
+        "result": {
+            "model": params.get("model", "gpt-3.5-turbo"),
+            "response": " ".join(tokens),
+            "usage": {
+                "prompt_tokens": 10,
+                "completion_tokens": 50,
+                "total_tokens": 60
+            }
+        }
+    }
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Chat con OpenAI (respuesta completa); simulado salvo que el proveedor tenga URL"""
+    if server.connectors.live("openai"):
+        return await complete(params, server)
+    result: Dict[str, Any] = {}
+    async for chunk in stream(params, server):
+        result = chunk.get("result", result)
+    return result
+
+
+TOOL = ToolDefinition(
+    tool_id="openai_chat",
+    name="Chat OpenAI",
+    description="Generar texto con GPT",
+    category="ai",
+    team_access=["code_generation", "research", "marketing", "strategy", "communications"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "model": {"type": "string", "default": "gpt-3.5-turbo"},
+            "message": {"type": "string"},
+            "temperature": {"type": "number", "default": 0.7},
+            "max_tokens": {"type": "integer", "default": 1000}
+        },
+        "required": ["message"]
+    },
+    handler=run,
+    stream_handler=stream,
+    timeout=60,
+    max_concurrency=20,
+    semantic_cache_field="message"
+)
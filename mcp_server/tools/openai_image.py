@@ -0,0 +1,46 @@
+"""
+Herramienta MCP: Generación de Imágenes DALL-E
+"""
+
+import uuid
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Generación de imagen DALL-E simulada"""
+    await server.connectors.acquire("openai")
+    await server.simulate_upstream("openai_image", 2.0)
+    return {
+        "prompt": params.get("prompt"),
+        "generated_images": [
+            {
+                "url": f"https://openai.com/dalle/generated_image_{uuid.uuid4().hex[:8]}.png",
+                "size": params.get("size", "1024x1024")
+            }
+        ]
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="openai_image",
+    name="Generación de Imágenes DALL-E",
+    description="Generar imágenes con DALL-E",
+    category="ai",
+    team_access=["design_creative", "marketing", "communications"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "prompt": {"type": "string"},
+            "size": {"type": "string", "default": "1024x1024"},
+            "n": {"type": "integer", "default": 1}
+        },
+        "required": ["prompt"]
+    },
+    handler=run,
+    timeout=120,
+    max_concurrency=5,
+    max_queue=10,
+    queue_timeout=10
+)
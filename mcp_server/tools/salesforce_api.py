@@ -0,0 +1,43 @@
+"""
+Herramienta MCP: API Salesforce
+"""
+
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """API Salesforce simulada"""
+    await server.connectors.acquire("salesforce")
+    await server.simulate_upstream("salesforce_api", 0.7)
+    return {
+        "query": params.get("query"),
+        "object_type": params.get("object_type"),
+        "results": [
+            {"id": f"sf_{i+1}", "name": f"Registro {i+1}"}
+            for i in range(3)
+        ],
+        "total_size": 3
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="salesforce_api",
+    name="API Salesforce",
+    description="Acceso a datos de CRM Salesforce",
+    category="crm",
+    team_access=["sales", "marketing", "business_development"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "query": {"type": "string"},
+            "object_type": {"type": "string"},
+            "operation": {"type": "string", "default": "query"}
+        },
+        "required": ["query"]
+    },
+    handler=run,
+    timeout=30,
+    max_concurrency=20
+)
@@ -0,0 +1,196 @@
+"""
+Validación de parámetros de herramientas MCP
+
+Cada ``parameters_schema`` (subconjunto de JSON Schema) se compila una sola vez
+al cargar la herramienta en un árbol de closures. Validar una petición es
+recorrer esas funciones sin volver a interpretar el esquema: se comprueban
+tipos, ``enum``, ``required``, ``format`` y rangos, y se aplican los
+``default`` sobre una copia de los parámetros.
+"""
+
+import copy
+import re
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+# Un validador recibe el valor y su ruta, añade errores y devuelve el valor normalizado
+Check = Callable[[Any, Tuple[Any, ...], List[Dict[str, Any]]], Any]
+ParameterValidator = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+URI_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://\S+$")
+
+# Marca que un nodo no tiene el tipo esperado y no tiene sentido seguir comprobándolo
+_INVALID = object()
+
+
+class ParameterValidationError(ValueError):
+    """Parámetros inválidos; ``errors`` sigue el formato de los 422 de FastAPI"""
+
+    def __init__(self, tool_id: str, errors: List[Dict[str, Any]]):
+        summary = "; ".join(f"{'.'.join(map(str, error['loc'][1:]))}: {error['msg']}" for error in errors)
+        super().__init__(f"Parámetros inválidos para {tool_id}: {summary}")
+        self.tool_id = tool_id
+        self.errors = errors
+
+
+def _error(errors: List[Dict[str, Any]], path: Tuple[Any, ...], msg: str, error_type: str):
+    errors.append({"loc": ["parameters", *path], "msg": msg, "type": error_type})
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_datetime(value: str) -> bool:
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return True
+    except ValueError:
+        return False
+
+
+FORMATS: Dict[str, Callable[[str], bool]] = {
+    "date": _is_date,
+    "date-time": _is_datetime,
+    "email": lambda value: EMAIL_PATTERN.match(value) is not None,
+    "uri": lambda value: URI_PATTERN.match(value) is not None,
+}
+
+# bool es subclase de int: se excluye explícitamente de integer/number
+TYPES: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+    "null": lambda value: value is None,
+}
+
+
+def _compile(schema: Dict[str, Any]) -> Check:
+    """Compilar un nodo del esquema en una lista de comprobaciones"""
+    checks: List[Check] = []
+
+    schema_type = schema.get("type")
+    if schema_type is not None:
+        allowed = schema_type if isinstance(schema_type, list) else [schema_type]
+        unknown = [name for name in allowed if name not in TYPES]
+        if unknown:
+            raise ValueError(f"Tipo de esquema no soportado: {', '.join(unknown)}")
+        predicates = [TYPES[name] for name in allowed]
+        expected = " | ".join(allowed)
+
+        def check_type(value, path, errors):
+            if not any(predicate(value) for predicate in predicates):
+                _error(errors, path, f"se esperaba {expected}", f"type_error.{allowed[0]}")
+                return _INVALID
+            return value
+        checks.append(check_type)
+
+    if "enum" in schema:
+        options = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in options:
+                _error(errors, path, f"valor no permitido; opciones: {options}", "value_error.enum")
+            return value
+        checks.append(check_enum)
+
+    if "format" in schema and schema["format"] in FORMATS:
+        format_name, is_valid = schema["format"], FORMATS[schema["format"]]
+
+        def check_format(value, path, errors):
+            if isinstance(value, str) and not is_valid(value):
+                _error(errors, path, f"formato {format_name} inválido", f"value_error.format.{format_name}")
+            return value
+        checks.append(check_format)
+
+    for keyword, compare, msg in (
+        ("minimum", lambda value, limit: value >= limit, "debe ser >= {}"),
+        ("maximum", lambda value, limit: value <= limit, "debe ser <= {}"),
+        ("minLength", lambda value, limit: len(value) >= limit, "longitud mínima {}"),
+        ("maxLength", lambda value, limit: len(value) <= limit, "longitud máxima {}"),
+    ):
+        if keyword in schema:
+            def check_limit(value, path, errors, limit=schema[keyword], compare=compare, msg=msg, keyword=keyword):
+                sized = keyword.endswith("Length")
+                applicable = isinstance(value, str) if sized else TYPES["number"](value)
+                if applicable and not compare(value, limit):
+                    _error(errors, path, msg.format(limit), f"value_error.{keyword.lower()}")
+                return value
+            checks.append(check_limit)
+
+    if schema.get("type") == "object" or "properties" in schema:
+        checks.append(_compile_object(schema))
+
+    if schema.get("type") == "array" and "items" in schema:
+        item_check = _compile(schema["items"])
+
+        def check_items(value, path, errors):
+            if isinstance(value, list):
+                return [item_check(item, (*path, index), errors) for index, item in enumerate(value)]
+            return value
+        checks.append(check_items)
+
+    def check(value, path, errors):
+        for step in checks:
+            checked = step(value, path, errors)
+            if checked is _INVALID:
+                break
+            value = checked
+        return value
+    return check
+
+
+def _compile_object(schema: Dict[str, Any]) -> Check:
+    properties = {name: _compile(subschema) for name, subschema in schema.get("properties", {}).items()}
+    defaults = {
+        name: subschema["default"]
+        for name, subschema in schema.get("properties", {}).items()
+        if "default" in subschema
+    }
+    required = [name for name in schema.get("required", []) if name not in defaults]
+    allow_extra = schema.get("additionalProperties", True) is not False
+
+    def check_object(value, path, errors):
+        if not isinstance(value, dict):
+            return value
+        result = dict(value)
+        for name in required:
+            if name not in result:
+                _error(errors, (*path, name), "campo requerido", "value_error.missing")
+        for name, default in defaults.items():
+            if name not in result:
+                # Solo los defaults mutables se copian para no compartirlos entre peticiones
+                result[name] = copy.deepcopy(default) if isinstance(default, (dict, list)) else default
+        for name, item in value.items():
+            property_check = properties.get(name)
+            if property_check is not None:
+                result[name] = property_check(item, (*path, name), errors)
+            elif not allow_extra:
+                _error(errors, (*path, name), "campo no permitido", "value_error.extra")
+        return result
+    return check_object
+
+
+def compile_schema(tool_id: str, schema: Dict[str, Any]) -> ParameterValidator:
+    """Compilar ``parameters_schema`` en un validador que aplica defaults
+
+    El validador devuelve una copia de los parámetros con los valores por
+    defecto aplicados o lanza ``ParameterValidationError`` con todos los errores.
+    """
+    check = _compile(schema or {"type": "object"})
+
+    def validate(parameters: Dict[str, Any]) -> Dict[str, Any]:
+        errors: List[Dict[str, Any]] = []
+        result = check(parameters, (), errors)
+        if errors:
+            raise ParameterValidationError(tool_id, errors)
+        return result
+    return validate
@@ -0,0 +1,43 @@
+"""
+Herramienta MCP: Envío de Email
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Envío de email simulado"""
+    await server.simulate_upstream("send_email", 0.5)
+    return {
+        "recipient": params.get("to"),
+        "subject": params.get("subject"),
+        "status": "sent",
+        "message_id": f"msg_{uuid.uuid4().hex[:16]}",
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="send_email",
+    name="Envío de Email",
+    description="Enviar emails a través de SMTP",
+    category="communication",
+    team_access=["marketing", "sales", "customer_service", "hr"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "to": {"type": "string", "format": "email"},
+            "subject": {"type": "string"},
+            "body": {"type": "string"},
+            "html_body": {"type": "string"}
+        },
+        "required": ["to", "subject", "body"]
+    },
+    handler=run,
+    timeout=30,
+    max_concurrency=20
+)
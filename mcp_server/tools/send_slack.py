@@ -0,0 +1,42 @@
+"""
+Herramienta MCP: Mensaje Slack
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Mensaje Slack simulado"""
+    await server.connectors.acquire("slack")
+    await server.simulate_upstream("send_slack", 0.3)
+    return {
+        "channel": params.get("channel"),
+        "message": params.get("message"),
+        "status": "sent",
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="send_slack",
+    name="Mensaje Slack",
+    description="Enviar mensajes a canales de Slack",
+    category="communication",
+    team_access=["support", "notifications", "strategy", "risk_management"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "channel": {"type": "string"},
+            "message": {"type": "string"},
+            "username": {"type": "string"},
+            "icon_emoji": {"type": "string"}
+        },
+        "required": ["channel", "message"]
+    },
+    handler=run,
+    timeout=10,
+    max_concurrency=50
+)
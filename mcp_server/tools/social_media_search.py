@@ -0,0 +1,51 @@
+"""
+Herramienta MCP: Búsqueda Redes Sociales
+"""
+
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Búsqueda en redes sociales simulada"""
+    await server.connectors.acquire("twitter")
+    await server.simulate_upstream("social_media_search", 0.8)
+    platform = params.get("platform", "twitter")
+    return {
+        "platform": platform,
+        "query": params.get("query"),
+        "results": [
+            {
+                "id": f"post_{i+1}",
+                "content": f"Post simulado {i+1} sobre {params.get('query')}",
+                "author": f"Usuario {i+1}",
+                "engagement": {"likes": i * 10, "shares": i * 5, "comments": i * 3}
+            }
+            for i in range(params.get("limit", 10))
+        ]
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="social_media_search",
+    name="Búsqueda Redes Sociales",
+    description="Buscar en Twitter y otras redes",
+    category="social",
+    team_access=["marketing", "research", "communications"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "platform": {"type": "string", "enum": ["twitter", "linkedin"]},
+            "query": {"type": "string"},
+            "lang": {"type": "string", "default": "es"},
+            "limit": {"type": "integer", "default": 50}
+        },
+        "required": ["platform", "query"]
+    },
+    handler=run,
+    timeout=20,
+    max_concurrency=30,
+    cache_ttl=300,
+    cache_stale_ttl=600
+)
@@ -0,0 +1,46 @@
+"""
+Herramienta MCP: Búsqueda Web
+"""
+
+from typing import Any, Dict
+
+from . import ToolDefinition
+
+
+async def run(params: Dict[str, Any], server: Any) -> Dict[str, Any]:
+    """Búsqueda web simulada"""
+    await server.connectors.acquire("serpapi")
+    await server.simulate_upstream("web_search", 0.5)  # Simular latencia de API
+    return {
+        "query": params.get("query"),
+        "results": [
+            {"title": f"Resultado {i+1} para {params.get('query')}", "url": f"https://ejemplo{i+1}.com"}
+            for i in range(params.get("num_results", 10))
+        ],
+        "total_results": params.get("num_results", 10),
+        "search_engine": "google"
+    }
+
+
+TOOL = ToolDefinition(
+    tool_id="web_search",
+    name="Búsqueda Web",
+    description="Realizar búsquedas en Google y otros motores",
+    category="search",
+    team_access=["research", "marketing", "sales", "strategy", "business_development"],
+    parameters_schema={
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "Términos de búsqueda"},
+            "num_results": {"type": "integer", "default": 10},
+            "lang": {"type": "string", "default": "es"},
+            "safe": {"type": "string", "default": "active"}
+        },
+        "required": ["query"]
+    },
+    handler=run,
+    timeout=15,
+    max_concurrency=50,
+    cache_ttl=600,
+    cache_stale_ttl=1800
+)
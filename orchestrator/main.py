@@ -17,7 +17,7 @@ import json
 from datetime import datetime, timedelta
 import os
 import asyncpg
-import redis
+from redis import asyncio as aioredis
 import httpx
 from contextlib import asynccontextmanager
 
@@ -37,6 +37,10 @@ RESEARCH_URL = os.getenv("RESEARCH_URL", "http://research-team:8000")
 SUPPORT_URL = os.getenv("SUPPORT_URL", "http://support-team:8000")
 NOTIFICATIONS_URL = os.getenv("NOTIFICATIONS_URL", "http://notifications-communication-team:8000")
 API_GATEWAY_URL = os.getenv("API_GATEWAY_URL", "http://api-gateway:8000")
+STATUS_CHANNEL_PREFIX = os.getenv("STATUS_CHANNEL_PREFIX", "haas:status")
+# Cola acotada de orquestación asíncrona: llena, se responde 503 en vez de crecer sin límite
+ORCHESTRATOR_QUEUE_SIZE = int(os.getenv("ORCHESTRATOR_QUEUE_SIZE", "10000"))
+ORCHESTRATOR_QUEUE_RETRY_AFTER = int(os.getenv("ORCHESTRATOR_QUEUE_RETRY_AFTER", "5"))
 
 # =====================================================
 # MODELOS DE DATOS
@@ -62,6 +66,10 @@ class OrchestrationRequest(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     estimated_duration: Optional[int] = Field(None, description="Duración estimada en segundos")
 
+class BatchOrchestrationRequest(BaseModel):
+    """Lote de solicitudes de orquestación enviado por el API Gateway"""
+    requests: List[OrchestrationRequest] = Field(..., description="Solicitudes del lote")
+
 class PromptEngineerRequest(BaseModel):
     """Solicitud al Prompt Engineer"""
     request_id: str
@@ -111,7 +119,7 @@ class EventManager:
     
     def __init__(self):
         self.connection_pool = None
-        self.redis_client = redis.from_url(REDIS_URL)
+        self.redis_client = aioredis.from_url(REDIS_URL)
     
     async def init_pool(self):
         """Inicializa el pool de conexiones a BD"""
@@ -157,39 +165,97 @@ class EventManager:
         finally:
             await self.connection_pool.release(conn)
     
-    async def update_read_model_task(
-        self, 
-        task_id: str,
-        tenant_id: str, 
+    async def _upsert_read_model(
+        self,
+        table: str,
+        id_column: str,
+        entity_id: str,
+        tenant_id: str,
         app_id: str,
         updates: Dict[str, Any]
     ):
-        """Actualiza el read model de tareas"""
+        """Inserta o actualiza una fila de read model ($1..$n son los valores de ``updates``)"""
         conn = await self.get_connection()
         try:
-            # Construir query de actualización dinámico
-            set_clauses = []
-            values = []
-            value_count = 1
-            
-            for key, value in updates.items():
-                set_clauses.append(f"{key} = ${value_count}")
-                values.append(value)
-                value_count += 1
-            
-            set_clause = ", ".join(set_clauses)
-            values.extend([task_id, tenant_id, app_id])
+            columns = list(updates.keys())
+            set_clause = ", ".join(f"{column} = ${index}" for index, column in enumerate(columns, start=1))
+            key_params = len(columns) + 1
             
             await conn.execute(f"""
-                INSERT INTO task_read_model 
-                (task_id, tenant_id, app_id, {', '.join(updates.keys())})
-                VALUES ($1, $2, $3, {', '.join([f'${i}' for i in range(4, 4 + len(updates))])})
-                ON CONFLICT (task_id) 
+                INSERT INTO {table}
+                ({id_column}, tenant_id, app_id, {', '.join(columns)})
+                VALUES (${key_params}, ${key_params + 1}, ${key_params + 2},
+                        {', '.join(f'${index}' for index in range(1, len(columns) + 1))})
+                ON CONFLICT ({id_column})
                 DO UPDATE SET {set_clause}, updated_at = NOW()
-            """, *values)
+            """, *updates.values(), entity_id, tenant_id, app_id)
             
         finally:
             await self.connection_pool.release(conn)
+    
+    async def update_read_model_task(
+        self, 
+        task_id: str,
+        tenant_id: str, 
+        app_id: str,
+        updates: Dict[str, Any]
+    ):
+        """Actualiza el read model de tareas
+        
+        ``task_id`` es el id que el API Gateway entregó al cliente (el
+        ``request_id`` de la orquestación), así que las transiciones llegan a
+        quien sigue la tarea por ``/stream/status?task_id=``.
+        """
+        await self._upsert_read_model("task_read_model", "task_id", task_id, tenant_id, app_id, updates)
+        
+        # Notificar la transición a los clientes suscritos vía API Gateway
+        if "task_status" in updates:
+            await self.publish_status_change(
+                tenant_id, app_id, "task", task_id, updates["task_status"], updates
+            )
+    
+    async def update_read_model_plan(
+        self,
+        plan_id: str,
+        tenant_id: str,
+        app_id: str,
+        updates: Dict[str, Any]
+    ):
+        """Actualiza el read model de planes y publica sus transiciones"""
+        await self._upsert_read_model("plan_read_model", "plan_id", plan_id, tenant_id, app_id, updates)
+        
+        if "plan_status" in updates:
+            await self.publish_status_change(
+                tenant_id, app_id, "plan", plan_id, updates["plan_status"], updates
+            )
+    
+    async def publish_status_change(
+        self,
+        tenant_id: str,
+        app_id: str,
+        entity_type: str,
+        entity_id: str,
+        new_status: str,
+        data: Optional[Dict[str, Any]] = None
+    ):
+        """Publica una transición de estado en Redis pub/sub para el streaming del gateway"""
+        try:
+            message = {
+                "tenant_id": tenant_id,
+                "app_id": app_id,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "status": new_status,
+                "data": data or {},
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            await self.redis_client.publish(
+                f"{STATUS_CHANNEL_PREFIX}:{tenant_id}",
+                json.dumps(message, default=str)
+            )
+        except Exception as e:
+            # La publicación es best-effort: el read model sigue siendo la fuente de verdad
+            logger.error(f"Error publishing status change: {str(e)}")
 
 # =====================================================
 # GESTOR DE PLANIFICACIÓN Y ASIGNACIÓN
@@ -418,7 +484,7 @@ class OrchestratorService:
         self.planning_manager = PlanningManager()
         self.prompt_engineer = PromptEngineerClient()
         self.active_requests = {}
-        self.request_queue = asyncio.Queue()
+        self.request_queue = asyncio.Queue(maxsize=ORCHESTRATOR_QUEUE_SIZE)
         
     async def initialize(self):
         """Inicializa el servicio"""
@@ -460,8 +526,8 @@ class OrchestratorService:
                 }
             )
             
-            # 2. Actualizar estado en read model
-            task_id = str(uuid.uuid4())
+            # 2. Actualizar estado en read model (con el id que ya tiene el cliente)
+            task_id = request.request_id
             await self.event_manager.update_read_model_task(
                 task_id, request.tenant_id, request.app_id, {
                     "task_name": request.objective[:50] + "...",
@@ -703,9 +769,11 @@ async def orchestrate_request_async(
     background_tasks: BackgroundTasks
 ):
     """Procesa una solicitud de orquestación de forma asíncrona"""
+    if orchestrator.request_queue.full():
+        raise queue_full_error()
     try:
         # Agregar a la cola para procesamiento asíncrono
-        await orchestrator.request_queue.put(request)
+        orchestrator.request_queue.put_nowait(request)
         
         return {
             "request_id": request.request_id,
@@ -720,6 +788,40 @@ async def orchestrate_request_async(
             detail="Failed to queue request"
         )
 
+def queue_full_error() -> HTTPException:
+    """503 con Retry-After para que el llamante reintente cuando haya hueco"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Orchestration queue is full",
+        headers={"Retry-After": str(ORCHESTRATOR_QUEUE_RETRY_AFTER)}
+    )
+
+@app.post("/orchestrate/async/batch")
+async def orchestrate_batch_async(batch: BatchOrchestrationRequest):
+    """Encola un lote de solicitudes de orquestación en una sola llamada
+    
+    El lote se acepta entero o se rechaza con 503 si no cabe en la cola.
+    """
+    queue = orchestrator.request_queue
+    if queue.maxsize and queue.maxsize - queue.qsize() < len(batch.requests):
+        raise queue_full_error()
+    try:
+        for request in batch.requests:
+            orchestrator.request_queue.put_nowait(request)
+        
+        return {
+            "status": "queued",
+            "queued": len(batch.requests),
+            "request_ids": [request.request_id for request in batch.requests],
+            "message": "Batch queued for processing"
+        }
+    except Exception as e:
+        logger.error(f"Batch queue error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to queue batch"
+        )
+
 @app.get("/requests/{request_id}")
 async def get_request_status(request_id: str):
     """Obtiene el estado de una request"""
@@ -875,6 +977,45 @@ async def task_failed_webhook(
             detail="Failed to process webhook"
         )
 
+@app.post("/webhook/plan-updated")
+async def plan_updated_webhook(
+    plan_data: Dict[str, Any]
+):
+    """Webhook del planificador para cada transición de estado de un plan"""
+    plan_id = plan_data.get("plan_id")
+    plan_status = plan_data.get("plan_status")
+    if not plan_id or not plan_status:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="plan_id and plan_status are required"
+        )
+    try:
+        logger.info(f"Plan {plan_id} updated: {plan_status}")
+        tenant_id = plan_data.get("tenant_id")
+        app_id = plan_data.get("app_id")
+        
+        await orchestrator.event_manager.update_read_model_plan(
+            plan_id, tenant_id, app_id, {"plan_status": plan_status}
+        )
+        await orchestrator.event_manager.store_event(
+            tenant_id, app_id, "PlanStatusChanged",
+            {
+                "plan_id": plan_id,
+                "plan_status": plan_status,
+                "details": plan_data.get("details")
+            },
+            aggregate_type="Plan",
+            aggregate_id=plan_id
+        )
+        
+        return {"status": "processed", "message": "Plan update webhook processed"}
+    except Exception as e:
+        logger.error(f"Error processing plan update webhook: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to process webhook"
+        )
+
 # =====================================================
 # PUNTO DE ENTRADA
 # =====================================================